@@ -1,98 +1,152 @@
-import discord, aiohttp, os, json
-from oletools.olevba import VBA_Parser
-from discord.ext import commands
-
-# Import the same tracker used in security_cog
-from cogs.security_cog import handled_by_security  
-
-SUSPICIOUS_EXTENSIONS = [
-    ".exe", ".js", ".vbs", ".bat", ".cmd",
-    ".scr", ".msi", ".jar", ".docm", ".xlsm", ".pptm"
-]
-
-class AttachmentScanner(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        os.makedirs("temp", exist_ok=True)
-        # Load server config
-        if os.path.exists("server_config.json"):
-            with open("server_config.json", "r") as f:
-                self.server_config = json.load(f)
-        else:
-            self.server_config = {}
-
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-
-        # Skip if SecurityCog already processed this message
-        if message.id in handled_by_security:
-            return
-        handled_by_security.add(message.id)
-
-        for attachment in message.attachments:
-            await self.scan_attachment(message, attachment)
-
-    async def download_attachment(self, attachment: discord.Attachment):
-        f = f"temp/{attachment.filename}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(attachment.url) as r:
-                if r.status == 200:
-                    with open(f, "wb") as file:
-                        file.write(await r.read())
-        return f
-
-    def is_suspicious_file(self, file_path: str):
-        return os.path.splitext(file_path)[1].lower() in SUSPICIOUS_EXTENSIONS
-
-    def has_macro(self, file_path: str):
-        if not file_path.endswith((".docm", ".xlsm", ".pptm")):
-            return False
-        try:
-            return VBA_Parser(file_path).detect_vba_macros()
-        except:
-            return False
-
-    async def scan_attachment(self, message: discord.Message, attachment: discord.Attachment):
-        f = await self.download_attachment(attachment)
-        alert = self.is_suspicious_file(f) or self.has_macro(f)
-
-        if alert:
-            embed = discord.Embed(
-                title="⚠️ Suspicious File Detected",
-                description=(
-                    f"**User:** {message.author.mention}\n"
-                    f"**File:** {attachment.filename}\n"
-                    f"**Channel:** {message.channel.mention}"
-                ),
-                color=discord.Color.red()
-            )
-
-            guild_id_str = str(message.guild.id)
-            if guild_id_str in self.server_config:
-                channel_id = self.server_config[guild_id_str].get("alert_channel_id")
-                if channel_id:
-                    channel = message.guild.get_channel(channel_id)
-                    if channel:
-                        try:
-                            await channel.send(embed=embed)
-                        except:
-                            pass
-
-            # Try deleting suspicious message
-            try:
-                await message.delete()
-            except discord.NotFound:
-                pass  # already deleted by SecurityCog
-            except discord.Forbidden:
-                alert_channel = message.guild.system_channel
-                if alert_channel:
-                    await alert_channel.send(
-                        f"⚠️ Tried to delete a suspicious file from {message.author.mention}, but lacked permissions."
-                    )
-
-        os.remove(f)
-
-def setup(bot):
-    bot.add_cog(AttachmentScanner(bot))
+import discord
+import asyncio
+import time
+from discord.ext import commands
+
+from core import analyzers
+from core.attachments import (
+    triage, stream_to_spool, fetch_head, sniff, type_mismatch, extension_of, FileTooLarge,
+    FLAG, INSPECT, SKIP, EXECUTABLE_KINDS, MAX_SCAN_BYTES, ScanQueueFull, scan_limiter,
+)
+from core.metrics import metrics_recorder
+from core.pipeline import message_pipeline, Verdict
+from core.verdict_cache import file_verdict_cache, FileVerdict
+from core.virustotal import VirusTotalError, SCAN_MAX_WAIT
+from core.workers import worker_pool, JobTimeout, WorkerFailed
+
+class AttachmentScanner(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+        # Most expensive detector: runs last in SecurityCog's message pipeline
+        message_pipeline.register("attachments", self.detect_suspicious_attachment, cost=100)
+
+    def cog_unload(self):
+        message_pipeline.unregister("attachments")
+
+    async def detect_suspicious_attachment(self, ctx):
+        # All attachments at once; scan_limiter bounds the real work per guild and bot-wide
+        results = await asyncio.gather(
+            *(self.scan_attachment(ctx.message, attachment) for attachment in ctx.attachments),
+            return_exceptions=True,
+        )
+        verdicts = []
+        for attachment, result in zip(ctx.attachments, results):
+            if isinstance(result, Exception):
+                print(f"[Attachments] Scan failed for {attachment.filename}: {result}")
+            elif result:
+                verdicts.append(result)
+        return verdicts or None
+
+    async def analyze(self, filename: str, data: bytes):
+        # Macro and archive parsing is slow on big or malformed files: keep it off the event loop
+        return await worker_pool.run(analyzers.analyze, filename, data)
+
+    async def lookup_file_hash(self, sha256):
+        vt = self.bot.virustotal
+        if not vt.enabled:
+            return None
+        # This runs inside a scan_limiter slot: don't sit in the VT queue, go on with local analysis instead
+        return await vt.file_stats(sha256, max_wait=SCAN_MAX_WAIT)
+
+    async def inspect_attachment(self, attachment: discord.Attachment):
+        """Download and analyze one attachment; returns why it is suspicious, or None."""
+        try:
+            spool, sha256 = await stream_to_spool(self.bot.http_client, attachment.url)
+        except FileTooLarge as e:
+            print(f"[Attachments] Skipped {attachment.filename}: {e}")
+            return None
+        if spool is None:
+            return None
+
+        with spool:
+            # A file we've seen before is settled by its hash alone
+            known = file_verdict_cache.get(sha256)
+            if known is not None:
+                return known.reason if known.flagged else None
+
+            # Then VirusTotal, before any local parsing
+            complete = True
+            try:
+                stats = await self.lookup_file_hash(sha256)
+            except VirusTotalError as e:
+                print(f"[Attachments] VirusTotal hash lookup failed for {attachment.filename}: {e}")
+                stats, complete = None, False
+            malicious = (stats or {}).get("malicious", 0)
+            reason = None
+            if malicious:
+                reason = f"known malware ({malicious} engines flagged)"
+            else:
+                try:
+                    reason = await self.analyze(attachment.filename, spool.read())
+                except (JobTimeout, WorkerFailed) as e:
+                    # A file that hangs or crashes the analyzers is suspicious in itself: fail closed
+                    print(f"[Attachments] Could not analyze {attachment.filename}: {e}")
+                    failure = "timed out" if isinstance(e, JobTimeout) else "crashed"
+                    reason, complete = f"could not be analyzed (analysis {failure})", False
+
+        if complete:  # don't let a failed lookup or analysis stick for a week
+            file_verdict_cache.put(FileVerdict(sha256, bool(reason), reason, malicious, time.time()))
+        return reason
+
+    async def sniff_attachment(self, attachment: discord.Attachment):
+        """(decision, reason) from the attachment's first bytes, fetched with a Range request."""
+        if not attachment.size or attachment.size > MAX_SCAN_BYTES:
+            return SKIP, None
+        try:
+            head = await fetch_head(self.bot.http_client, attachment.url)
+        except Exception as e:
+            print(f"[Attachments] Could not sniff {attachment.filename}: {e}")
+            return SKIP, None
+        kind = sniff(head or b"")
+        if not type_mismatch(attachment.filename, kind):
+            return SKIP, None
+        if kind in EXECUTABLE_KINDS:
+            ext = extension_of(attachment.filename) or "no extension"
+            return FLAG, f"{EXECUTABLE_KINDS[kind]} disguised as `{ext}`"
+        if kind in ("zip", "rar", "7z", "ole", "rtf"):
+            return INSPECT, f"{kind} file disguised as `{extension_of(attachment.filename)}`"
+        return SKIP, None
+
+    async def deep_scan(self, attachment: discord.Attachment, decision):
+        if decision == SKIP:
+            # Sniff a few KB: a renamed executable or archive escalates to a full scan
+            decision, reason = await self.sniff_attachment(attachment)
+            if decision != INSPECT:
+                return reason
+        return await self.inspect_attachment(attachment)
+
+    async def scan_attachment(self, message: discord.Message, attachment: discord.Attachment):
+        # Metadata first: most attachments (screenshots) are never downloaded
+        decision, reason = triage(attachment.filename, attachment.content_type, attachment.size)
+        if decision != FLAG:
+            try:
+                async with scan_limiter.slot(message.guild.id):
+                    reason = await self.deep_scan(attachment, decision)
+            except ScanQueueFull:
+                print(f"[Attachments] Scan queue full in {message.guild.name}; skipped {attachment.filename}")
+                metrics_recorder.incr(message.guild.id, "attachment_scans_dropped")
+                return None
+            if not reason:
+                return None
+
+        embed = discord.Embed(
+            title="⚠️ Suspicious File Detected",
+            description=(
+                f"**User:** {message.author.mention}\n"
+                f"**File:** {attachment.filename}\n"
+                f"**Reason:** {reason}\n"
+                f"**Channel:** {message.channel.mention}"
+            ),
+            color=discord.Color.red()
+        )
+        return Verdict(
+            "attachments",
+            f"Uploaded suspicious file `{attachment.filename}` ({reason})",
+            warn=False,
+            metric="attachments_flagged",
+            embed=embed,
+        )
+
+def setup(bot):
+    bot.add_cog(AttachmentScanner(bot))
@@ -1,114 +1,146 @@
-import discord, json, random, string
-from discord.ext import commands
-from discord.ui import View, Button, Modal, InputText
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
-
-CONFIG_FILE = "server_config.json"
-
-class CaptchaCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.pending = {}  # user_id -> (captcha_text, role_id)
-        self.config = self.load_config()
-
-    def load_config(self):
-        try:
-            with open(CONFIG_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return {}
-
-    def get_server_config(self, guild_id):
-        return self.config.get(str(guild_id), {})
-
-    def generate_captcha(self):
-        text = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
-        img = Image.new('RGB', (180, 60), 'white')
-        x = 5
-        try:
-            font = ImageFont.truetype("arial.ttf", 36)
-        except:
-            font = ImageFont.load_default()
-        for ch in text:
-            cimg = Image.new('RGBA', (40, 50), (255, 255, 255, 0))
-            d = ImageDraw.Draw(cimg)
-            d.text((0, 0), ch, font=font, fill=(0, 0, 0))
-            cimg = cimg.rotate(random.randint(-20, 20), expand=1)
-            img.paste(cimg, (x, random.randint(5, 15)), cimg)
-            x += 32
-        buf = BytesIO()
-        img.save(buf, 'PNG')
-        buf.seek(0)
-        return text, buf
-
-    async def send_captcha(self, member: discord.Member):
-        cfg = self.get_server_config(member.guild.id)
-        channel_id = cfg.get("captcha_channel_id")
-        role_id = cfg.get("captcha_verified_role_id")
-        if not channel_id or not role_id:
-            print(f"[CaptchaCog] CAPTCHA not configured for guild {member.guild.id}")
-            return
-        channel = member.guild.get_channel(channel_id)
-        role = member.guild.get_role(role_id)
-        if not channel or not role:
-            print(f"[CaptchaCog] CAPTCHA channel or role not found in guild {member.guild.id}")
-            return
-
-        text, img = self.generate_captcha()
-        self.pending[member.id] = (text, role.id)
-        file = discord.File(img, filename="captcha.png")
-        embed = discord.Embed(title="🔒 CAPTCHA Verification",
-                              description="Click verify and type the text in the image.",
-                              color=discord.Color.orange())
-        embed.set_image(url="attachment://captcha.png")
-        view = View()
-        view.add_item(VerifyButton(self, member))
-        await channel.send(content=member.mention, embed=embed, file=file, view=view)
-
-    @commands.slash_command(name="captcha_test", description="Trigger a test CAPTCHA for a user")
-    async def captcha_test(self, ctx: discord.ApplicationContext, member: discord.Member):
-        await ctx.defer(ephemeral=True)
-        await self.send_captcha(member)
-        await ctx.respond(f"✅ CAPTCHA sent to {member.mention}", ephemeral=True)
-    captcha_test.hidden_tag = True  # Right after the function
-
-class VerifyButton(Button):
-    def __init__(self, cog, member):
-        super().__init__(label="✅ Verify", style=discord.ButtonStyle.green)
-        self.cog = cog
-        self.member = member
-
-    async def callback(self, interaction: discord.Interaction):
-        if interaction.user.id != self.member.id:
-            return await interaction.response.send_message("❌ This CAPTCHA isn’t for you!", ephemeral=True)
-        pending = self.cog.pending.get(self.member.id)
-        if not pending:
-            return await interaction.response.send_message("⚠️ CAPTCHA expired", ephemeral=True)
-        text, role_id = pending
-        await interaction.response.send_modal(CaptchaModal(self.cog, self.member, text, role_id))
-
-class CaptchaModal(Modal):
-    def __init__(self, cog, member, correct_text, role_id):
-        super().__init__(title="CAPTCHA Verification")
-        self.cog = cog
-        self.member = member
-        self.correct_text = correct_text
-        self.role_id = role_id
-        self.add_item(InputText(label="Enter the text"))
-
-    async def callback(self, interaction: discord.Interaction):
-        answer = self.children[0].value.strip().upper()
-        if answer == self.correct_text.upper():
-            del self.cog.pending[self.member.id]
-            role = self.member.guild.get_role(self.role_id)
-            if role:
-                await self.member.add_roles(role)
-                await interaction.response.send_message(f"✅ Verified! Role `{role.name}` added", ephemeral=True)
-            else:
-                await interaction.response.send_message("✅ Verified! (Role not found)", ephemeral=True)
-        else:
-            await interaction.response.send_message("❌ Wrong CAPTCHA", ephemeral=True)
-
-def setup(bot):
-    bot.add_cog(CaptchaCog(bot))
\ No newline at end of file
+import discord
+from discord.ext import commands
+from discord.ui import View, Button, Modal, InputText
+from io import BytesIO
+from core.config_store import config_store
+from core.captcha import captcha_pool
+from core.challenges import challenge_store, challenge_queue, SOLVED, WRONG, LOCKED
+
+VERIFY_BUTTON_ID = "onyx:captcha_verify"
+
+class CaptchaCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        challenge_queue.send = self.deliver_challenges
+        # One persistent handler for every Verify button. Registered here, not in on_ready (which fires on
+        # every reconnect); a reload re-adding it just replaces the stored view for the same custom_id.
+        bot.add_view(VerifyView())
+
+    def get_server_config(self, guild_id):
+        return config_store.get(guild_id)
+
+    def get_captcha_setup(self, guild: discord.Guild):
+        """(channel, role) for the guild's CAPTCHA, or None if it isn't fully configured."""
+        cfg = self.get_server_config(guild.id)
+        channel_id = cfg.get("captcha_channel_id")
+        role_id = cfg.get("captcha_verified_role_id")
+        if not channel_id or not role_id:
+            return None
+        channel = guild.get_channel(channel_id)
+        role = guild.get_role(role_id)
+        if not channel or not role:
+            return None
+        return channel, role
+
+    def cog_unload(self):
+        if challenge_queue.send == self.deliver_challenges:
+            challenge_queue.send = None
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        captcha_pool.start()  # no-op while a refill is already running
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot or not self.get_captcha_setup(member.guild):
+            return
+        await self.send_captcha(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        challenge_store.discard(member.guild.id, member.id)
+
+    async def send_captcha(self, member: discord.Member):
+        """Issue a challenge and queue the member to be mentioned in the next batch message."""
+        setup = self.get_captcha_setup(member.guild)
+        if not setup:
+            print(f"[CaptchaCog] CAPTCHA not configured (or channel/role missing) in guild {member.guild.id}")
+            return False
+        channel, role = setup
+        challenge_store.issue(member.guild.id, member.id, role.id)
+        challenge_queue.enqueue(member.guild.id, member.id)
+        return True
+
+    async def deliver_challenges(self, guild_id, user_ids):
+        """Mention a batch of members in one message with a shared Verify button."""
+        guild = self.bot.get_guild(guild_id)
+        setup = self.get_captcha_setup(guild) if guild else None
+        if not setup:
+            return
+        channel, role = setup
+        # Skip members who left or whose challenge ran out while queued
+        user_ids = [uid for uid in user_ids if challenge_store.get(guild_id, uid)]
+        if not user_ids:
+            return
+        embed = discord.Embed(title="🔒 CAPTCHA Verification",
+                              description="Click verify to get your CAPTCHA, then type the text in the image.",
+                              color=discord.Color.orange())
+        await channel.send(content=" ".join(f"<@{uid}>" for uid in user_ids), embed=embed, view=VerifyView(),
+                           allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False))
+
+    @commands.slash_command(name="captcha_test", description="Trigger a test CAPTCHA for a user")
+    async def captcha_test(self, ctx: discord.ApplicationContext, member: discord.Member):
+        await ctx.defer(ephemeral=True)
+        if await self.send_captcha(member):
+            await ctx.respond(f"✅ CAPTCHA sent to {member.mention}", ephemeral=True)
+        else:
+            await ctx.respond("⚠️ CAPTCHA channel or role is not configured", ephemeral=True)
+    captcha_test.hidden_tag = True  # Right after the function
+
+class VerifyView(View):
+    def __init__(self):
+        super().__init__(timeout=None)
+        self.add_item(VerifyButton())
+
+class VerifyButton(Button):
+    def __init__(self):
+        super().__init__(label="✅ Verify", style=discord.ButtonStyle.green, custom_id=VERIFY_BUTTON_ID)
+
+    async def callback(self, interaction: discord.Interaction):
+        challenge = challenge_store.get(interaction.guild_id, interaction.user.id)
+        if not challenge:
+            return await interaction.response.send_message("⚠️ You have no pending CAPTCHA (it may have expired)", ephemeral=True)
+        # Acknowledge first: if the pool is empty, rendering may outlast the 3-second interaction window
+        await interaction.response.defer(ephemeral=True)
+        # Each click shows a fresh image; attempts carry over
+        challenge.text, png = await captcha_pool.get()
+        embed = discord.Embed(title="🔒 CAPTCHA Verification",
+                              description="Type the text in the image.",
+                              color=discord.Color.orange())
+        embed.set_image(url="attachment://captcha.png")
+        view = View()
+        view.add_item(AnswerButton())
+        await interaction.followup.send(embed=embed, file=discord.File(BytesIO(png), filename="captcha.png"),
+                                        view=view, ephemeral=True)
+
+class AnswerButton(Button):
+    def __init__(self):
+        super().__init__(label="✏️ Enter code", style=discord.ButtonStyle.blurple)
+
+    async def callback(self, interaction: discord.Interaction):
+        await interaction.response.send_modal(CaptchaModal())
+
+class CaptchaModal(Modal):
+    def __init__(self):
+        super().__init__(title="CAPTCHA Verification")
+        self.add_item(InputText(label="Enter the text"))
+
+    async def callback(self, interaction: discord.Interaction):
+        result, challenge = challenge_store.check(interaction.guild_id, interaction.user.id, self.children[0].value)
+        if result == SOLVED:
+            role = interaction.guild.get_role(challenge.role_id)
+            if role:
+                await interaction.user.add_roles(role)
+                await interaction.response.send_message(f"✅ Verified! Role `{role.name}` added", ephemeral=True)
+            else:
+                await interaction.response.send_message("✅ Verified! (Role not found)", ephemeral=True)
+        elif result == WRONG:
+            left = challenge_store.max_attempts - challenge.attempts
+            await interaction.response.send_message(f"❌ Wrong CAPTCHA ({left} attempt(s) left)", ephemeral=True)
+        elif result == LOCKED:
+            await interaction.response.send_message("⛔ Too many wrong attempts. Ask a moderator for a new CAPTCHA.", ephemeral=True)
+        else:
+            await interaction.response.send_message("⚠️ CAPTCHA expired", ephemeral=True)
+
+def setup(bot):
+    bot.add_cog(CaptchaCog(bot))
@@ -1,310 +1,337 @@
-import discord
-from discord.ext import commands, tasks
-import aiohttp
-import asyncio
-import re
-import json
-import tldextract
-import base64
-import time
-from datetime import timedelta
-import os
-
-CONFIG_FILE = "server_config.json"
-METRICS_FILE = "server_metrics.json"
-OFFENSES_FILE = "offenses.json"
-
-# --- Regex for masked [text](url) and raw URLs ---
-URL_REGEX = re.compile(
-    r'\[.*?\]\((https?://[^\s]+)\)|'  # masked link
-    r'(https?://[^\s]+)'              # raw url
-)
-
-# --- JSON helpers ---
-def load_json(file):
-    if os.path.exists(file):
-        with open(file, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_json(file, data):
-    with open(file, "w") as f:
-        json.dump(data, f, indent=4)
-
-# --- Offenses helpers ---
-def load_offenses():
-    return load_json(OFFENSES_FILE)
-
-def save_offenses(data):
-    save_json(OFFENSES_FILE, data)
-
-# --- Global tracking ---
-handled_by_security = set()
-
-def encode_url_to_vt_id(url):
-    return base64.urlsafe_b64encode(url.encode("utf-8")).decode().rstrip("=")
-
-def extract_urls(text: str):
-    matches = URL_REGEX.findall(text)
-    urls = []
-    for m in matches:
-        if isinstance(m, tuple):
-            urls.append(m[0] or m[1])
-        else:
-            urls.append(m)
-    return [u for u in urls if u]
-
-class SecurityCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.link_cache = {}
-        self.CACHE_EXPIRY = 60 * 60
-        self.server_metrics = load_json(METRICS_FILE)
-        self.GLOBAL_BLACKLISTED_DOMAINS = ["grabify.link", "iplogger.org", "bmwforum.co", "yip.su", "pornhub.com"]
-        self.GLOBAL_BLACKLISTED_KEYWORDS = ["Free Nitro", "nitro giveaway", "free crypto", "btc giveaway", "free robux", "Robux giveaway"]
-        self.GLOBAL_ALLOWED_DOMAINS = ["youtube.com", "x.com", "tiktok.com", "discord.com", "discord.gg"]
-        self.VT_API_KEY = os.getenv("VT_API_KEY")
-
-    # --- Config helpers ---
-    def load_config(self):
-        return load_json(CONFIG_FILE)
-
-    def get_alert_channel(self, guild: discord.Guild):
-        config = self.load_config()
-        alert_id = config.get(str(guild.id), {}).get("alert_channel_id")
-        return guild.get_channel(alert_id) if alert_id else None
-
-    def get_admin_role(self, guild: discord.Guild):
-        config = self.load_config()
-        role_id = config.get(str(guild.id), {}).get("admin_role_id")
-        return guild.get_role(role_id) if role_id else None
-
-    def get_dangerous_perms(self, guild: discord.Guild):
-        config = self.load_config()
-        return set(config.get(str(guild.id), {}).get("dangerous_perms", [
-            "administrator","ban_members","kick_members","manage_guild","manage_roles","manage_webhooks"
-        ]))
-
-    # --- Metrics ---
-    def init_guild_metrics(self, guild_id):
-        gid = str(guild_id)
-        if gid not in self.server_metrics:
-            self.server_metrics[gid] = {"links_removed": 0, "warnings_issued": 0, "users_banned": 0}
-            save_json(METRICS_FILE, self.server_metrics)
-
-    def update_metric(self, guild_id, metric_name, amount=1):
-        self.init_guild_metrics(guild_id)
-        self.server_metrics[str(guild_id)][metric_name] += amount
-        save_json(METRICS_FILE, self.server_metrics)
-
-    # --- Offenses ---
-    def init_user_offenses(self, guild_id, user_id):
-        data = load_offenses()
-        gid = str(guild_id)
-        uid = str(user_id)
-        if gid not in data:
-            data[gid] = {}
-        if uid not in data[gid]:
-            data[gid][uid] = 0
-        save_offenses(data)
-
-    async def warn_user(self, guild: discord.Guild, user: discord.Member, alert_channel: discord.TextChannel, reason: str):
-        data = load_offenses()
-        gid = str(guild.id)
-        uid = str(user.id)
-        self.init_user_offenses(gid, uid)
-
-        data = load_offenses()
-        data[gid][uid] += 1
-        warnings = data[gid][uid]
-
-        config = self.load_config()
-        guild_config = config.get(gid, {})
-        ban_threshold = guild_config.get("ban_threshold", 3)
-
-        # --- Warning / timeout / kick / ban logic stays unchanged ---
-        # (Everything from your existing warn_user method remains here)
-        # You can keep the long chain of if warnings == ... etc.
-
-        save_offenses(data)
-
-    # --- Token/credentials check ---
-    def contains_token_or_credentials(self, content: str) -> bool:
-        token_pattern = re.compile(r"([A-Za-z0-9_\-]{24}\.[A-Za-z0-9_\-]{6}\.[A-Za-z0-9_\-]{27})")
-        password_pattern = re.compile(r"(password\s*[:=]\s*\S+)", re.IGNORECASE)
-        return bool(token_pattern.search(content) or password_pattern.search(content))
-
-    # --- VirusTotal ---
-    async def get_vt_url_report(self, url: str):
-        if not self.VT_API_KEY:
-            return None
-        now = time.time()
-        cache_entry = self.link_cache.get(url)
-        if cache_entry:
-            ts, data = cache_entry
-            if now - ts < self.CACHE_EXPIRY:
-                return data
-        vt_id = encode_url_to_vt_id(url)
-        endpoint = f"https://www.virustotal.com/api/v3/urls/{vt_id}"
-        headers = {"x-apikey": self.VT_API_KEY}
-        try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(endpoint, headers=headers) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        self.link_cache[url] = (now, data)
-                        return data
-                    self.link_cache[url] = (now, None)
-                    return None
-        except Exception as e:
-            print(f"VirusTotal request failed for {url}: {e}")
-            return None
-
-    # --- Message handler ---
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-        if message.id in handled_by_security:
-            return
-        handled_by_security.add(message.id)
-
-        guild_id = message.guild.id
-        self.init_guild_metrics(guild_id)
-        alert_channel = self.get_alert_channel(message.guild)
-
-        # --- Invite link ---
-        if any(word.startswith("https://discord.gg/") for word in message.content.split()):
-            try: await message.delete()
-            except: pass
-            self.update_metric(guild_id, "warnings_issued")
-            await self.warn_user(message.guild, message.author, alert_channel, "Sharing server invites")
-
-        # --- Token/credentials ---
-        if self.contains_token_or_credentials(message.content):
-            try: await message.delete()
-            except: pass
-            self.update_metric(guild_id, "warnings_issued")
-            await self.warn_user(message.guild, message.author, alert_channel, "Sharing credentials or tokens")
-
-        # --- Keyword check ---
-        config = self.load_config()
-        guild_config = config.get(str(guild_id), {})
-        combined_keywords = set(self.GLOBAL_BLACKLISTED_KEYWORDS + guild_config.get("blacklisted_keywords", []))
-        for keyword in combined_keywords:
-            if keyword.lower() in message.content.lower():
-                try: await message.delete()
-                except: pass
-                self.update_metric(guild_id, "warnings_issued")
-                await self.warn_user(message.guild, message.author, alert_channel, f"Using blacklisted keyword `{keyword}`")
-
-        SPECIAL_GUILD_ID = 1235429763129016361  # Replace with your guild ID
-
-        # --- URL check ---
-        urls = extract_urls(message.content)
-        combined_domains = set(self.GLOBAL_BLACKLISTED_DOMAINS + guild_config.get("blacklisted_domains", []))
-        for url in urls:
-            extracted = tldextract.extract(url)
-            domain = extracted.registered_domain
-
-            if domain in self.GLOBAL_ALLOWED_DOMAINS:
-                continue
-
-            if domain in combined_domains or any(domain.endswith(bad) for bad in combined_domains):
-                try: 
-                    await message.delete()
-                except: 
-                    pass
-                
-                # Skip warnings and metric updates for the special guild
-                if guild_id != SPECIAL_GUILD_ID:
-                    self.update_metric(guild_id, "links_removed")
-                    await self.warn_user(message.guild, message.author, alert_channel, f"Sent blacklisted domain `{domain}`")
-                
-                return
-
-            # VirusTotal check
-            vt_data = await self.get_vt_url_report(url)
-            if vt_data:
-                malicious_votes = vt_data.get("data", {}).get("attributes", {}).get("last_analysis_stats", {}).get("malicious", 0)
-                if malicious_votes > 0:
-                    try: 
-                        await message.delete()
-                    except: 
-                        pass
-                    
-                    if guild_id != SPECIAL_GUILD_ID:
-                        self.update_metric(guild_id, "links_removed")
-                        await self.warn_user(message.guild, message.author, alert_channel, f"Sent malicious URL `{url}` ({malicious_votes} engines flagged)")
-                    
-                    return
-
-    # --- Guild join / webhooks ---
-    @commands.Cog.listener()
-    async def on_guild_join(self, guild: discord.Guild):
-        self.init_guild_metrics(guild.id)
-        try:
-            webhooks = await guild.webhooks()
-            print(f"[Security] {guild.name} has {len(webhooks)} existing webhooks.")
-        except Exception as e:
-            print(f"[Security] Failed to fetch webhooks in {guild.name}: {e}")
-
-    # --- Webhook monitor loop ---
-    @tasks.loop(minutes=1)
-    async def webhook_monitor(self):
-        for guild in self.bot.guilds:
-            try:
-                webhooks = await guild.webhooks()
-                print(f"[Security] Monitoring {guild.name}: {len(webhooks)} webhooks present.")
-            except Exception as e:
-                print(f"[Security] Failed to fetch webhooks in {guild.name}: {e}")
-
-    # --- Catch new webhook creations ---
-    @commands.Cog.listener()
-    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
-        if entry.action != discord.AuditLogAction.webhook_create:
-            return
-
-        guild = entry.guild
-        webhook = entry.target
-        user = entry.user
-        if not webhook or not user or user.id == guild.me.id:
-            return
-
-        member = guild.get_member(user.id)
-        if member and member.guild_permissions.administrator:
-            return
-
-        try:
-            await webhook.delete(reason=f"Unauthorized webhook created by {user}")
-            print(f"[Security] Deleted unauthorized webhook {webhook.name} created by {user} in {guild.name}")
-            alert_channel = self.get_alert_channel(guild)
-            if alert_channel:
-                await alert_channel.send(f"🚨 Deleted unauthorized webhook **{webhook.name}** created by `{user}`.")
-            if member and alert_channel:
-                await self.warn_user(guild, member, alert_channel, reason="Unauthorized webhook creation")
-        except Exception as e:
-            print(f"[Security] Failed to delete webhook in {guild.name}: {e}")
-
-    # --- Metrics command ---
-    @commands.command(name="metrics")
-    async def metrics(self, ctx):
-        self.init_guild_metrics(ctx.guild.id)
-        data = self.server_metrics[str(ctx.guild.id)]
-        embed = discord.Embed(title="Server Security Metrics", color=discord.Color.green())
-        embed.add_field(name="Links Removed", value=str(data["links_removed"]))
-        embed.add_field(name="Warnings Issued", value=str(data["warnings_issued"]))
-        embed.add_field(name="Users Banned/Timed Out", value=str(data["users_banned"]))
-        await ctx.send(embed=embed)
-
-    # --- Start monitor loop ---
-    @commands.Cog.listener()
-    async def on_ready(self):
-        if not self.webhook_monitor.is_running():
-            self.webhook_monitor.start()
-
-
-def setup(bot):
-    print("Running SecurityCog setup()")
-    bot.add_cog(SecurityCog(bot))
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import re
+from datetime import timedelta
+from core.config_store import config_store
+from core.domains import domain_parser
+from core.virustotal import VirusTotalError, PRIORITY_LIVE
+from core.matching import GuildKeywordMatchers, GuildDomainIndex, ALLOW, DENY
+from core.metrics import metrics_recorder, FLUSH_INTERVAL
+from core.offenses import offense_ledger, DEFAULT_WINDOW_HOURS, SWEEP_INTERVAL
+from core.pipeline import message_pipeline, Verdict
+from core.webhooks import webhook_inventory, RESYNC_CHECK
+
+SPECIAL_GUILD_ID = 1235429763129016361  # Replace with your guild ID
+
+# Seconds a message waits for remote URL verdicts (per guild: "url_scan_budget")
+URL_SCAN_BUDGET = 3.0
+
+class SecurityCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.GLOBAL_BLACKLISTED_DOMAINS = ["grabify.link", "iplogger.org", "bmwforum.co", "yip.su", "pornhub.com"]
+        self.GLOBAL_BLACKLISTED_KEYWORDS = ["Free Nitro", "nitro giveaway", "free crypto", "btc giveaway", "free robux", "Robux giveaway"]
+        self.GLOBAL_ALLOWED_DOMAINS = ["youtube.com", "x.com", "tiktok.com", "discord.com", "discord.gg"]
+        self.keyword_matchers = GuildKeywordMatchers(self.GLOBAL_BLACKLISTED_KEYWORDS)
+        self.domain_index = GuildDomainIndex(self.GLOBAL_BLACKLISTED_DOMAINS, self.GLOBAL_ALLOWED_DOMAINS)
+        self.background_tasks = set()  # late URL verdicts still running (referenced so they aren't collected)
+
+        message_pipeline.executor = self.apply_decision
+        message_pipeline.register("invite", self.detect_invite, cost=0)
+        message_pipeline.register("credentials", self.detect_credentials, cost=1)
+        message_pipeline.register("keywords", self.detect_keywords, cost=2)
+        message_pipeline.register("domains", self.detect_blacklisted_domains, cost=3)
+        message_pipeline.register("virustotal", self.detect_malicious_urls, cost=50)
+
+    # --- Config helpers ---
+    def get_alert_channel(self, guild: discord.Guild):
+        alert_id = config_store.get(guild.id).get("alert_channel_id")
+        return guild.get_channel(alert_id) if alert_id else None
+
+    def get_admin_role(self, guild: discord.Guild):
+        role_id = config_store.get(guild.id).get("admin_role_id")
+        return guild.get_role(role_id) if role_id else None
+
+    def get_dangerous_perms(self, guild: discord.Guild):
+        return set(config_store.get(guild.id).get("dangerous_perms", [
+            "administrator","ban_members","kick_members","manage_guild","manage_roles","manage_webhooks"
+        ]))
+
+    # --- Metrics ---
+    def update_metric(self, guild_id, metric_name, amount=1):
+        metrics_recorder.incr(guild_id, metric_name, amount)
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def metrics_flusher(self):
+        metrics_recorder.flush()
+
+    @tasks.loop(seconds=SWEEP_INTERVAL)
+    async def offense_sweeper(self):
+        offense_ledger.sweep()
+
+    def cog_unload(self):
+        for name in ("invite", "credentials", "keywords", "domains", "virustotal"):
+            message_pipeline.unregister(name)
+        if message_pipeline.executor == self.apply_decision:
+            message_pipeline.executor = None
+        self.metrics_flusher.cancel()
+        self.offense_sweeper.cancel()
+        self.webhook_resync.cancel()
+        metrics_recorder.flush()
+
+    # --- Offenses ---
+    async def warn_user(self, guild: discord.Guild, user: discord.Member, alert_channel: discord.TextChannel, reason: str):
+        guild_config = config_store.get(guild.id)
+        ban_threshold = guild_config.get("ban_threshold", 3)
+
+        # Only offenses inside the guild's window count towards ban_threshold
+        window_hours = guild_config.get("offense_window_hours", DEFAULT_WINDOW_HOURS)
+        warnings = offense_ledger.record(guild.id, user.id, reason, window_hours=window_hours)
+
+        # --- Warning / timeout / kick / ban logic stays unchanged ---
+        # (Everything from your existing warn_user method remains here)
+        # You can keep the long chain of if warnings == ... etc.
+
+    # --- Token/credentials check ---
+    def contains_token_or_credentials(self, content: str) -> bool:
+        token_pattern = re.compile(r"([A-Za-z0-9_\-]{24}\.[A-Za-z0-9_\-]{6}\.[A-Za-z0-9_\-]{27})")
+        password_pattern = re.compile(r"(password\s*[:=]\s*\S+)", re.IGNORECASE)
+        return bool(token_pattern.search(content) or password_pattern.search(content))
+
+    # --- VirusTotal ---
+    async def get_url_verdict(self, url: str):
+        vt = self.bot.virustotal
+        if not vt.enabled:
+            return None
+        try:
+            return await vt.url_verdict(url, priority=PRIORITY_LIVE)
+        except VirusTotalError as e:
+            print(f"VirusTotal request failed for {url}: {e}")
+            return None
+
+    # --- Message handler ---
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        await message_pipeline.process(message)
+
+    async def apply_decision(self, message: discord.Message, verdicts):
+        guild = message.guild
+        alert_channel = self.get_alert_channel(guild)
+
+        if any(v.delete for v in verdicts):
+            try:
+                await message.delete()
+            except discord.NotFound:
+                pass  # already gone
+            except discord.Forbidden:
+                fallback = alert_channel or guild.system_channel
+                if fallback:
+                    try:
+                        await fallback.send(f"⚠️ Tried to delete a message from {message.author.mention}, but lacked permissions.")
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+
+        for verdict in verdicts:
+            if verdict.metric:
+                self.update_metric(guild.id, verdict.metric)
+            if verdict.embed and alert_channel:
+                try:
+                    await alert_channel.send(embed=verdict.embed)
+                except Exception:
+                    pass
+
+        # One warning per message, however many detectors fired
+        reasons = [v.reason for v in verdicts if v.warn]
+        if reasons:
+            await self.warn_user(guild, message.author, alert_channel, "; ".join(reasons))
+
+    # --- Detectors (cheapest first) ---
+    async def detect_invite(self, ctx):
+        if any(word.startswith("https://discord.gg/") for word in ctx.content.split()):
+            return Verdict("invite", "Sharing server invites", metric="warnings_issued")
+
+    async def detect_credentials(self, ctx):
+        if self.contains_token_or_credentials(ctx.content):
+            return Verdict("credentials", "Sharing credentials or tokens", metric="warnings_issued")
+
+    async def detect_keywords(self, ctx):
+        keyword_matcher = self.keyword_matchers.get(ctx.guild.id, ctx.guild_config.get("blacklisted_keywords", ()))
+        return [
+            Verdict("keywords", f"Using blacklisted keyword `{keyword}`", metric="warnings_issued")
+            for keyword in keyword_matcher.matched(ctx.content)
+        ] or None
+
+    def link_verdict(self, ctx, reason):
+        # Skip warnings and metric updates for the special guild
+        if ctx.guild.id == SPECIAL_GUILD_ID:
+            return Verdict("links", reason, warn=False)
+        return Verdict("links", reason, metric="links_removed")
+
+    async def detect_blacklisted_domains(self, ctx):
+        guild_domains = ctx.guild_config.get("blacklisted_domains", ())
+        for url in ctx.urls:
+            hostname = domain_parser.parse_url(url).fqdn
+            verdict, domain = self.domain_index.resolve(ctx.guild.id, guild_domains, hostname)
+            if verdict == DENY:
+                return self.link_verdict(ctx, f"Sent blacklisted domain `{domain}`")
+
+    async def detect_malicious_urls(self, ctx):
+        guild_domains = ctx.guild_config.get("blacklisted_domains", ())
+        urls = [
+            url for url in ctx.urls
+            if self.domain_index.resolve(ctx.guild.id, guild_domains, domain_parser.parse_url(url).fqdn)[0] != ALLOW
+        ]
+        if not urls:
+            return None
+
+        # Check every URL at once, but only hold the message up for the budget
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ctx.guild_config.get("url_scan_budget", URL_SCAN_BUDGET)
+        pending = {asyncio.ensure_future(self.check_url(ctx, url)) for url in urls}
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        return task.result()
+            if pending:
+                task = asyncio.ensure_future(self.apply_late_verdict(ctx, pending))
+                self.background_tasks.add(task)
+                task.add_done_callback(self.background_tasks.discard)
+                pending = set()  # handed over
+        finally:
+            # Once the message is decided the other lookups are not needed; cancelling
+            # them also releases their queued VirusTotal slots
+            for task in pending:
+                task.cancel()
+
+    async def check_url(self, ctx, url):
+        guild_domains = ctx.guild_config.get("blacklisted_domains", ())
+        try:
+            # Shortened links are expanded; every hop gets the blacklist and VirusTotal checks
+            chain = await self.bot.redirects.expand(url)
+            targets = []
+            for hop in chain:
+                verdict, domain = self.domain_index.resolve(ctx.guild.id, guild_domains, domain_parser.parse_url(hop).fqdn)
+                if verdict == DENY:
+                    return self.link_verdict(ctx, f"Sent link `{url}` redirecting to blacklisted domain `{domain}`")
+                if verdict != ALLOW:
+                    targets.append(hop)
+            reports = await asyncio.gather(*(self.get_url_verdict(hop) for hop in targets))
+        except Exception as e:
+            print(f"[Security] URL check failed for {url}: {e}")
+            return None
+        for hop, report in zip(targets, reports):
+            if report and report.malicious > 0:
+                if hop == url:
+                    return self.link_verdict(ctx, f"Sent malicious URL `{url}` ({report.malicious} engines flagged)")
+                return self.link_verdict(ctx, f"Sent link `{url}` redirecting to malicious URL `{hop}` ({report.malicious} engines flagged)")
+
+    async def apply_late_verdict(self, ctx, pending):
+        # Lookups that outlived the budget still get acted on when they land
+        try:
+            for task in asyncio.as_completed(pending):
+                verdict = await task
+                if verdict:
+                    print(f"[Security] Late link verdict for message {ctx.message.id}")
+                    await message_pipeline.apply(ctx.message, [verdict])
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # --- Webhook inventory ---
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        await webhook_inventory.fetch_guild(guild)
+        print(f"[Security] {guild.name} has {webhook_inventory.count(guild.id)} existing webhooks.")
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        webhook_inventory.forget(guild.id)
+
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel):
+        for webhook in await webhook_inventory.fetch_channel(channel):
+            await self.review_webhook(channel.guild, webhook, webhook.user)
+
+    @tasks.loop(seconds=RESYNC_CHECK)
+    async def webhook_resync(self):
+        async for guild, added in webhook_inventory.resync_due(self.bot.get_guild):
+            for webhook in added:
+                await self.review_webhook(guild, webhook, webhook.user)
+
+    # --- Catch new webhook creations ---
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        guild = entry.guild
+        webhook = entry.target
+        if not webhook:
+            return
+        if entry.action == discord.AuditLogAction.webhook_delete:
+            webhook_inventory.remove(guild.id, webhook.id)
+        elif entry.action == discord.AuditLogAction.webhook_update:
+            webhook_inventory.add(guild.id, webhook)
+        elif entry.action == discord.AuditLogAction.webhook_create:
+            if webhook.id in webhook_inventory.handled:
+                return  # on_webhooks_update got there first
+            webhook_inventory.add(guild.id, webhook)
+            await self.review_webhook(guild, webhook, entry.user)
+
+    async def review_webhook(self, guild: discord.Guild, webhook, user):
+        """Delete a new webhook unless an administrator (or the bot) created it."""
+        if not user or user.id == guild.me.id:
+            return
+        if not webhook_inventory.handled.add(webhook.id):
+            return  # already reviewed from another event
+
+        member = guild.get_member(user.id)
+        if member and member.guild_permissions.administrator:
+            return
+
+        try:
+            await webhook.delete(reason=f"Unauthorized webhook created by {user}")
+            webhook_inventory.remove(guild.id, webhook.id)
+            self.update_metric(guild.id, "webhooks_deleted")
+            print(f"[Security] Deleted unauthorized webhook {webhook.name} created by {user} in {guild.name}")
+            alert_channel = self.get_alert_channel(guild)
+            if alert_channel:
+                await alert_channel.send(f"🚨 Deleted unauthorized webhook **{webhook.name}** created by `{user}`.")
+            if member and alert_channel:
+                await self.warn_user(guild, member, alert_channel, reason="Unauthorized webhook creation")
+        except Exception as e:
+            print(f"[Security] Failed to delete webhook in {guild.name}: {e}")
+
+    # --- Metrics command ---
+    @commands.command(name="metrics")
+    async def metrics(self, ctx):
+        data = metrics_recorder.totals(ctx.guild.id)
+        embed = discord.Embed(title="Server Security Metrics", color=discord.Color.green())
+        for name, label in (
+            ("links_removed", "Links Removed"),
+            ("warnings_issued", "Warnings Issued"),
+            ("users_banned", "Users Banned/Timed Out"),
+        ):
+            last_hour = metrics_recorder.recent(ctx.guild.id, name, 3600)
+            last_day = metrics_recorder.recent(ctx.guild.id, name, 86400)
+            embed.add_field(name=label, value=f"{data.get(name, 0)}\n`{last_hour}` last hour · `{last_day}` last 24h")
+        extra = {name: value for name, value in data.items() if name not in ("links_removed", "warnings_issued", "users_banned")}
+        if extra:
+            embed.add_field(
+                name="Other",
+                value="\n".join(f"{name.replace('_', ' ').title()}: {value}" for name, value in sorted(extra.items())),
+                inline=False,
+            )
+        await ctx.send(embed=embed)
+
+    # --- Start background loops ---
+    @commands.Cog.listener()
+    async def on_ready(self):
+        webhook_inventory.start_seed(self.bot.guilds)
+        if not self.webhook_resync.is_running():
+            self.webhook_resync.start()
+        if not self.metrics_flusher.is_running():
+            self.metrics_flusher.start()
+        if not self.offense_sweeper.is_running():
+            self.offense_sweeper.start()
+
+
+def setup(bot):
+    print("Running SecurityCog setup()")
+    bot.add_cog(SecurityCog(bot))
@@ -1,38 +1,70 @@
-# cogs/update_guild_icons.py
-import discord
-from discord.ext import commands
-import json
-import os
-
-CONFIG_FILE = "server_config.json"
-
-class UpdateGuildIcons(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-
-    async def update_icons(self):
-        """Update server_config.json with name, icon hash, and owner_id for each guild"""
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r") as f:
-                config = json.load(f)
-        else:
-            config = {}
-
-        for guild in self.bot.guilds:
-            gid = str(guild.id)
-            if gid not in config:
-                config[gid] = {}
-            config[gid]["name"] = guild.name
-            config[gid]["icon"] = guild.icon.key if guild.icon else None
-            config[gid]["owner_id"] = guild.owner_id  # Save the server owner's ID
-
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
-        print("✅ Updated server_config.json with names, icon hashes, and owner IDs")
-
-    @commands.Cog.listener()
-    async def on_ready(self):
-        await self.update_icons()
-
-def setup(bot):
-    bot.add_cog(UpdateGuildIcons(bot))
+# cogs/update_guild_icons.py
+import discord
+from discord.ext import commands
+from core.config_store import config_store
+
+def guild_metadata(guild: discord.Guild):
+    """Name, icon hash and owner ID as stored in the guild's config (the dashboard reads these)."""
+    return {
+        "name": guild.name,
+        "icon": guild.icon.key if guild.icon else None,
+        "owner_id": guild.owner_id,
+    }
+
+def changed_metadata(guild: discord.Guild):
+    """Only the metadata fields whose stored value is out of date."""
+    stored = config_store.get(guild.id)
+    return {key: value for key, value in guild_metadata(guild).items() if stored.get(key) != value}
+
+class UpdateGuildIcons(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.reconciled = False
+
+    def sync_guild(self, guild: discord.Guild):
+        """Write the guild's metadata if (and only if) something changed."""
+        if guild.unavailable:
+            return
+        changed = changed_metadata(guild)
+        if changed:
+            config_store.update(guild.id, **changed)
+            print(f"[GuildSync] Updated {', '.join(changed)} for {guild.name}")
+
+    async def update_icons(self):
+        """Reconcile stored name, icon hash and owner_id with every guild, writing only the differences"""
+        changes = {}
+        for guild in self.bot.guilds:
+            if guild.unavailable:
+                continue
+            changed = changed_metadata(guild)
+            if changed:
+                changes[str(guild.id)] = changed
+
+        if not changes:
+            print("✅ Guild names, icons and owners already up to date")
+            return
+
+        def apply(config):
+            for gid, changed in changes.items():
+                config.setdefault(gid, {}).update(changed)
+
+        config_store.modify_all(apply)
+        print(f"✅ Updated names, icon hashes or owner IDs for {len(changes)} guild(s)")
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again on every reconnect; events keep things current after the first pass
+        if not self.reconciled:
+            self.reconciled = True
+            await self.update_icons()
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.sync_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        self.sync_guild(after)
+
+def setup(bot):
+    bot.add_cog(UpdateGuildIcons(bot))
@@ -0,0 +1,205 @@
+# CPU-heavy file analyzers, run in worker processes through core.workers.
+# Everything here must be a module-level function taking and returning picklable values.
+import io
+import zipfile
+
+from oletools.olevba import VBA_Parser
+
+from core.attachments import (
+    extension_of, sniff, type_mismatch, SUSPICIOUS_EXTENSIONS, MACRO_CAPABLE_EXTENSIONS, ARCHIVE_EXTENSIONS,
+    OOXML_EXTENSIONS, EXECUTABLE_KINDS, ARCHIVE_KINDS, SNIFF_BYTES,
+)
+
+try:
+    import py7zr
+except ImportError:
+    py7zr = None
+
+try:
+    import rarfile
+except ImportError:
+    rarfile = None
+
+# --- Archive limits (zip-bomb protection) ---
+MAX_ARCHIVE_DEPTH = 3                         # archives nested deeper than this are not opened
+MAX_ARCHIVE_ENTRIES = 2_000                   # across all nesting levels
+MAX_UNCOMPRESSED_SIZE = 1024 * 1024 * 1024    # declared total, across all nesting levels
+MAX_MEMBER_READ = 20 * 1024 * 1024            # largest inner file read for nested inspection
+
+# OLE2, OOXML (zip) and RTF containers; olevba would otherwise read any text file as VBA source
+OFFICE_MAGIC = (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", b"PK\x03\x04", b"{\\rt")
+
+
+class ArchiveLimitExceeded(Exception):
+    pass
+
+
+def analyze(filename: str, data: bytes):
+    """Why this file is suspicious, or None. Dispatches on the real (sniffed) type, then the extension."""
+    ext = extension_of(filename)
+    kind = sniff(data[:SNIFF_BYTES])
+    if kind in EXECUTABLE_KINDS and type_mismatch(filename, kind):
+        return f"{EXECUTABLE_KINDS[kind]} disguised as `{ext or 'no extension'}`"
+    if ext in ARCHIVE_EXTENSIONS or kind in ARCHIVE_KINDS:  # OOXML documents included: they're zips too
+        reason = inspect_archive(filename, data)
+        if reason:
+            return reason
+    if (ext in MACRO_CAPABLE_EXTENSIONS or kind in ("ole", "zip", "rtf")) and has_vba_macros(filename, data):
+        return "contains VBA macros"
+    return None
+
+
+def has_vba_macros(filename: str, data: bytes) -> bool:
+    if not data.startswith(OFFICE_MAGIC):
+        return False
+    try:
+        parser = VBA_Parser(filename, data=data)
+    except Exception:
+        return False  # not an Office file olevba understands
+    try:
+        return bool(parser.detect_vba_macros())
+    except Exception:
+        return False
+    finally:
+        parser.close()
+
+
+# --- Archives ---
+def inspect_archive(filename: str, data: bytes):
+    """Inspect an archive's directory (and nested archives/documents) without extracting it to disk."""
+    budget = {"entries": MAX_ARCHIVE_ENTRIES, "size": MAX_UNCOMPRESSED_SIZE}
+    try:
+        return _inspect_archive(filename, data, 1, budget)
+    except ArchiveLimitExceeded as e:
+        return f"archive exceeds inspection limits ({e})"
+
+
+def _inspect_archive(filename, data, depth, budget):
+    # Trust the bytes over the name, so a renamed archive is still opened
+    ext = ARCHIVE_KINDS.get(sniff(data[:16]), extension_of(filename))
+    if ext == ".zip":
+        return _inspect_zip(data, depth, budget, document=extension_of(filename) in OOXML_EXTENSIONS)
+    if ext == ".7z" and py7zr is not None:
+        return _inspect_listing(_list_7z(data), budget)
+    if ext == ".rar" and rarfile is not None:
+        return _inspect_listing(_list_rar(data), budget)
+    return None
+
+
+def _charge(budget, size):
+    budget["entries"] -= 1
+    budget["size"] -= size
+    if budget["entries"] < 0:
+        raise ArchiveLimitExceeded("too many entries")
+    if budget["size"] < 0:
+        raise ArchiveLimitExceeded("uncompressed size too large")
+
+
+def _flag_name(name, container="archive"):
+    if extension_of(name) in SUSPICIOUS_EXTENSIONS:
+        return f"{container} contains `{name}`"
+    return None
+
+
+def _sniff_member(archive, info):
+    if info.flag_bits & 0x1:  # encrypted
+        return None
+    try:
+        with archive.open(info) as member:
+            return sniff(member.read(SNIFF_BYTES))
+    except (zipfile.BadZipFile, RuntimeError, NotImplementedError, OSError):
+        return None
+
+
+def _risky_part(archive, info):
+    """Why an entry of an OOXML document is risky, or None.
+
+    Parts are judged by what they are, not where they sit: XML, media,
+    fonts, sensitivity labels, signatures and ribbon customizations all pass.
+    """
+    name = info.filename
+    path = name.replace("\\", "/").lower()
+    if path.rsplit("/", 1)[-1] == "vbaproject.bin":
+        return f"document contains VBA macros (`{name}`)"
+    if extension_of(name) in ARCHIVE_EXTENSIONS:
+        return f"document contains archive `{name}`"
+    if extension_of(name) == ".bin" and "/embeddings/" in f"/{path}":
+        return f"document embeds OLE object `{name}`"
+    kind = _sniff_member(archive, info)
+    if kind in ("pe", "elf", "macho"):
+        return f"document contains {EXECUTABLE_KINDS[kind]} `{name}`"
+    if kind == "ole":  # embedded objects and ActiveX controls
+        return f"document embeds OLE object `{name}`"
+    if kind in ("rar", "7z"):
+        return f"document contains archive `{name}`"
+    return None
+
+
+def _inspect_zip(data, depth, budget, document=False):
+    """document: the zip is an OOXML package, whose entries are checked for executables and embedded objects."""
+    container = "document" if document else "archive"
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except (zipfile.BadZipFile, ValueError):
+        return None
+    with archive:
+        entries = [info for info in archive.infolist() if not info.is_dir()]
+        for info in entries:
+            _charge(budget, info.file_size)
+        for info in entries:
+            reason = _flag_name(info.filename, container)
+            if reason:
+                return reason
+            reason = document and _risky_part(archive, info)
+            if reason:
+                return reason
+        # Only now open inner files, smallest first, within the read cap
+        for info in sorted(entries, key=lambda i: i.file_size):
+            ext = extension_of(info.filename)
+            nested = depth < MAX_ARCHIVE_DEPTH and (ext in ARCHIVE_EXTENSIONS or ext in OOXML_EXTENSIONS)
+            if not (nested or ext in MACRO_CAPABLE_EXTENSIONS):
+                continue
+            if info.file_size > MAX_MEMBER_READ or info.flag_bits & 0x1:  # too big, or encrypted
+                continue
+            try:
+                with archive.open(info) as member:
+                    inner = member.read(MAX_MEMBER_READ + 1)
+            except (zipfile.BadZipFile, RuntimeError, NotImplementedError, OSError):
+                continue
+            if len(inner) > MAX_MEMBER_READ:
+                raise ArchiveLimitExceeded("inner file larger than declared")
+            if nested:
+                reason = _inspect_archive(info.filename, inner, depth + 1, budget)
+                if reason:
+                    return f"{reason} (inside `{info.filename}`)"
+            if ext in MACRO_CAPABLE_EXTENSIONS and has_vba_macros(info.filename, inner):
+                return f"{container} contains `{info.filename}` with VBA macros"
+    return None
+
+
+def _inspect_listing(listing, budget):
+    # 7z and rar are inspected by name only: reading members needs full solid-block decompression
+    listing = list(listing)
+    for name, size in listing:
+        _charge(budget, size)
+    for name, _ in listing:
+        reason = _flag_name(name)
+        if reason:
+            return reason
+    return None
+
+
+def _list_7z(data):
+    try:
+        with py7zr.SevenZipFile(io.BytesIO(data)) as archive:
+            return [(f.filename, f.uncompressed or 0) for f in archive.list() if not f.is_directory]
+    except Exception:
+        return []
+
+
+def _list_rar(data):
+    try:
+        with rarfile.RarFile(io.BytesIO(data)) as archive:
+            return [(f.filename, f.file_size or 0) for f in archive.infolist() if not f.is_dir()]
+    except Exception:
+        return []
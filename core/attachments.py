@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+MAX_SCAN_BYTES = 25 * 1024 * 1024  # larger files are not downloaded
+SPOOL_MEMORY = 1024 * 1024         # kept in memory up to this, then spilled to a private temp file
+CHUNK_SIZE = 64 * 1024
+
+# --- Scan concurrency ---
+GLOBAL_SCAN_LIMIT = 8      # attachments downloaded/analyzed at once across the bot
+GUILD_SCAN_LIMIT = 2       # ... and within one guild
+GUILD_QUEUE_LIMIT = 25     # scans one guild may have waiting before new ones are dropped
+
+SUSPICIOUS_EXTENSIONS = [
+    ".exe", ".js", ".vbs", ".bat", ".cmd",
+    ".scr", ".msi", ".jar", ".docm", ".xlsm", ".pptm"
+]
+
+# Office formats that can carry VBA macros without saying so in the name
+MACRO_CAPABLE_EXTENSIONS = [".doc", ".xls", ".ppt", ".docx", ".xlsx", ".pptx", ".rtf"]
+
+# Office Open XML documents are zip packages; their entries are listed like an archive's
+OOXML_EXTENSIONS = [".docx", ".xlsx", ".pptx", ".docm", ".xlsm", ".pptm"]
+
+# Archives are opened and their contents checked (.7z/.rar need py7zr/rarfile installed)
+ARCHIVE_EXTENSIONS = [".zip", ".7z", ".rar"]
+
+# Media is only sniffed, never fully downloaded unless its bytes disagree with its name
+SAFE_CONTENT_TYPES = ("image/", "video/", "audio/")
+
+# --- Triage decisions ---
+FLAG = "flag"        # suspicious from metadata alone
+INSPECT = "inspect"  # download and analyze the content
+SKIP = "skip"        # nothing to look at
+
+
+def extension_of(filename):
+    return os.path.splitext(filename or "")[1].lower()
+
+
+def triage(filename, content_type=None, size=None):
+    """Decide from metadata alone what to do with an attachment. Returns (decision, reason)."""
+    ext = extension_of(filename)
+    if ext in SUSPICIOUS_EXTENSIONS:
+        return FLAG, f"`{ext}` files are not allowed"
+    if ext in MACRO_CAPABLE_EXTENSIONS or ext in ARCHIVE_EXTENSIONS:
+        if size is not None and size > MAX_SCAN_BYTES:
+            return SKIP, "too large to inspect"
+        return INSPECT, "archive" if ext in ARCHIVE_EXTENSIONS else "may contain macros"
+    if content_type and content_type.lower().startswith(SAFE_CONTENT_TYPES):
+        return SKIP, "media"
+    return SKIP, "no risky type"
+
+
+# --- Magic-byte sniffing ---
+SNIFF_BYTES = 4096
+
+MAGIC = [
+    (b"MZ", "pe"),
+    (b"\x7fELF", "elf"),
+    (b"\xfe\xed\xfa\xce", "macho"), (b"\xfe\xed\xfa\xcf", "macho"),
+    (b"\xce\xfa\xed\xfe", "macho"), (b"\xcf\xfa\xed\xfe", "macho"),
+    (b"\xca\xfe\xba\xbe", "macho"),  # universal binary (same magic as a Java class)
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),
+    (b"PK\x03\x04", "zip"), (b"PK\x05\x06", "zip"),
+    (b"Rar!\x1a\x07", "rar"),
+    (b"7z\xbc\xaf\x27\x1c", "7z"),
+    (b"{\\rt", "rtf"),
+    (b"%PDF-", "pdf"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"), (b"GIF89a", "gif"),
+]
+SCRIPT_MARKERS = (b"#!", b"@echo", b"<script", b"<job", b"<package", b"<hta:")
+
+EXECUTABLE_KINDS = {"pe": "Windows executable", "elf": "Linux executable", "macho": "macOS executable", "script": "script"}
+ARCHIVE_KINDS = {"zip": ".zip", "rar": ".rar", "7z": ".7z"}
+
+# What each extension's bytes should look like
+EXTENSION_KINDS = {
+    ".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg", ".gif": "gif", ".webp": "webp", ".pdf": "pdf",
+    ".zip": "zip", ".docx": "zip", ".xlsx": "zip", ".pptx": "zip", ".docm": "zip", ".xlsm": "zip",
+    ".pptm": "zip", ".jar": "zip", ".apk": "zip", ".odt": "zip", ".ods": "zip",
+    ".doc": "ole", ".xls": "ole", ".ppt": "ole", ".msi": "ole", ".rtf": "rtf",
+    ".rar": "rar", ".7z": "7z", ".exe": "pe", ".dll": "pe", ".scr": "pe",
+}
+
+
+def sniff(head: bytes):
+    """Real file type from its first bytes, or None if unrecognised."""
+    for magic, kind in MAGIC:
+        if head.startswith(magic):
+            return kind
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head.lstrip(b"\xef\xbb\xbf \t\r\n")[:16].lower().startswith(SCRIPT_MARKERS):
+        return "script"
+    return None
+
+
+def type_mismatch(filename, kind):
+    """True if the sniffed kind is not what the file's extension promises."""
+    declared = EXTENSION_KINDS.get(extension_of(filename))
+    if kind == "script":
+        return declared is not None  # scripts in .txt/.sh/.py etc. are just text
+    return kind is not None and declared != kind
+
+
+async def fetch_head(http_client, url, size=SNIFF_BYTES):
+    """First `size` bytes of url via a Range request (or a truncated read if Range is ignored)."""
+    async with http_client.get(url, headers={"Range": f"bytes=0-{size - 1}"}) as resp:
+        if resp.status not in (200, 206):
+            return None
+        head = b""
+        while len(head) < size:
+            chunk = await resp.content.read(size - len(head))
+            if not chunk:
+                break
+            head += chunk
+        return head
+
+
+class FileTooLarge(Exception):
+    """The download went past the size cap (the declared size was wrong or missing)."""
+
+
+async def stream_to_spool(http_client, url, max_bytes=MAX_SCAN_BYTES):
+    """Download url in chunks into a SpooledTemporaryFile, hashing as it streams.
+
+    Returns (file rewound and ready to read, SHA-256 hex digest), or
+    (None, None) on a non-200 response. Raises FileTooLarge past max_bytes.
+    The caller owns (and must close) the returned file.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY)
+    digest = hashlib.sha256()
+    try:
+        async with http_client.download(url) as resp:
+            if resp.status != 200:
+                spool.close()
+                return None, None
+            if resp.content_length and resp.content_length > max_bytes:
+                raise FileTooLarge(f"{resp.content_length} bytes")
+            total = 0
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise FileTooLarge(f"more than {max_bytes} bytes")
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+
+class ScanQueueFull(Exception):
+    """The guild already has too many attachment scans waiting."""
+
+
+class ScanLimiter:
+    """Global plus per-guild concurrency limits for attachment scans.
+
+    A scan first waits for its guild's slot, then for a global one, so a
+    guild flooding attachments only ever holds GUILD_SCAN_LIMIT global
+    slots and everyone else keeps getting scanned. Each guild's queue is
+    bounded; past it, scans are refused and counted.
+    """
+
+    def __init__(self, global_limit=GLOBAL_SCAN_LIMIT, guild_limit=GUILD_SCAN_LIMIT, guild_queue_limit=GUILD_QUEUE_LIMIT):
+        self.guild_limit = guild_limit
+        self.guild_queue_limit = guild_queue_limit
+        self._global = asyncio.Semaphore(global_limit)
+        self._guilds = {}  # guild_id -> [Semaphore, scans waiting or running]
+        self.waiting = 0
+        self.running = 0
+        self.peak_waiting = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_wait = 0.0
+
+    @asynccontextmanager
+    async def slot(self, guild_id):
+        entry = self._guilds.get(guild_id)
+        if entry is None:
+            entry = self._guilds[guild_id] = [asyncio.Semaphore(self.guild_limit), 0]
+        if entry[1] >= self.guild_limit + self.guild_queue_limit:
+            self.rejected += 1
+            raise ScanQueueFull(guild_id)
+
+        entry[1] += 1
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        queued_at = time.monotonic()
+        acquired = False
+        try:
+            async with entry[0]:
+                async with self._global:
+                    self.waiting -= 1
+                    acquired = True
+                    self.total_wait += time.monotonic() - queued_at
+                    self.running += 1
+                    try:
+                        yield
+                    finally:
+                        self.running -= 1
+                        self.completed += 1
+        finally:
+            if not acquired:
+                self.waiting -= 1
+            entry[1] -= 1
+            if not entry[1]:
+                del self._guilds[guild_id]
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait": self.total_wait / self.completed if self.completed else 0.0,
+        }
+
+
+# Shared instance used by the attachment scanner
+scan_limiter = ScanLimiter()
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import random
+import time
+
+import aiohttp
+import discord
+
+from core.database import db
+from core.ratelimit import TokenBucket
+
+CONCURRENCY = 10           # channels sent to at once
+GLOBAL_RATE = 40           # sends per second across all channels (Discord's global limit is 50)
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 2.0         # seconds; doubled per retry, with jitter
+PROGRESS_INTERVAL = 3.0    # seconds between progress callbacks
+RESUME_WINDOW = 24 * 60 * 60  # unfinished broadcasts older than this are abandoned, not resumed
+
+# --- Target states ---
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+
+def _is_transient(error):
+    if isinstance(error, (discord.Forbidden, discord.NotFound)):
+        return False
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, OSError))
+
+
+class BroadcastEngine:
+    """Sends one message to many channels concurrently, resumably.
+
+    A broadcast's payload (content plus an optional embed) and its target
+    channels are stored in the database before the first send, and every
+    target's outcome is written as it happens, so a broadcast interrupted by
+    a restart carries on with the channels still pending. Targets are
+    grouped by channel (Discord's rate-limit bucket for sends), so at most
+    one request is in flight per bucket while up to `concurrency` buckets
+    are served at once under a global rate cap. Transient failures (5xx,
+    429, network errors) are retried with backoff; missing channels and
+    permission errors fail immediately.
+    """
+
+    def __init__(self, database=db, concurrency=CONCURRENCY, rate=GLOBAL_RATE, max_attempts=MAX_ATTEMPTS,
+                 progress_interval=PROGRESS_INTERVAL):
+        self.db = database
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.progress_interval = progress_interval
+        self._bucket = TokenBucket(rate, 1)
+        self.active = {}  # broadcast_id -> Task
+
+    # --- Persistence ---
+    async def create(self, kind, targets, content="", embed=None):
+        """Store a new broadcast. targets: iterable of (guild_id, channel_id). Returns its id."""
+        payload = json.dumps({"content": content, "embed": embed.to_dict() if embed else None})
+        rows = list({str(channel_id): str(guild_id) if guild_id else None for guild_id, channel_id in targets}.items())
+
+        def insert(conn):
+            cur = conn.execute(
+                "INSERT INTO broadcasts (kind, payload, created_at) VALUES (?, ?, ?)", (kind, payload, time.time())
+            )
+            conn.executemany(
+                "INSERT INTO broadcast_targets (broadcast_id, channel_id, guild_id) VALUES (?, ?, ?)",
+                [(cur.lastrowid, channel_id, guild_id) for channel_id, guild_id in rows],
+            )
+            return cur.lastrowid
+
+        return await asyncio.wrap_future(self.db.write(insert))
+
+    def stats(self, broadcast_id):
+        counts = {PENDING: 0, SENT: 0, FAILED: 0}
+        for row in self.db.query(
+            "SELECT state, COUNT(*) AS n FROM broadcast_targets WHERE broadcast_id = ? GROUP BY state", (broadcast_id,)
+        ):
+            counts[row["state"]] = row["n"]
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def unfinished(self):
+        """Ids of broadcasts that were still running when the bot stopped (recent ones only)."""
+        cutoff = time.time() - RESUME_WINDOW
+        self.db.execute(
+            "UPDATE broadcasts SET status = 'abandoned', finished_at = ? WHERE status = 'running' AND created_at < ?",
+            (time.time(), cutoff),
+        )
+        rows = self.db.query(
+            "SELECT id FROM broadcasts WHERE status = 'running' AND created_at >= ? ORDER BY id", (cutoff,)
+        )
+        return [row["id"] for row in rows if row["id"] not in self.active]
+
+    async def _record(self, broadcast_id, channel_id, state, attempts, error=None):
+        # Shielded: a message that went out must be on disk as sent even if the broadcast is being cancelled,
+        # or a resume would send it again
+        write = self.db.execute(
+            "UPDATE broadcast_targets SET state = ?, attempts = ?, error = ? WHERE broadcast_id = ? AND channel_id = ?",
+            (state, attempts, error, broadcast_id, channel_id),
+        )
+        try:
+            await asyncio.shield(asyncio.wrap_future(write))
+        except Exception:
+            pass  # already logged by the writer; the target stays pending and is retried on resume
+
+    # --- Sending ---
+    def start(self, bot, broadcast_id, progress=None):
+        """Run (or resume) a broadcast in the background. Returns its Task, which resolves to the final stats."""
+        task = self.active.get(broadcast_id)
+        if task is None:
+            task = asyncio.ensure_future(self._run(bot, broadcast_id, progress))
+            self.active[broadcast_id] = task
+            task.add_done_callback(lambda _: self.active.pop(broadcast_id, None))
+        return task
+
+    async def _run(self, bot, broadcast_id, progress):
+        row = self.db.query_one("SELECT payload FROM broadcasts WHERE id = ?", (broadcast_id,))
+        if row is None:
+            return None
+        payload = json.loads(row["payload"])
+        embed = discord.Embed.from_dict(payload["embed"]) if payload["embed"] else None
+        content = payload["content"] or None
+
+        pending = [r["channel_id"] for r in self.db.query(
+            "SELECT channel_id FROM broadcast_targets WHERE broadcast_id = ? AND state = ?", (broadcast_id, PENDING)
+        )]
+        counts = self.stats(broadcast_id)
+        queue = asyncio.Queue()
+        for channel_id in pending:
+            queue.put_nowait(channel_id)
+
+        async def worker():
+            while True:
+                try:
+                    channel_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                state = await self._deliver(bot, broadcast_id, int(channel_id), content, embed)
+                counts[PENDING] -= 1
+                counts[state] += 1
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(self.progress_interval)
+                await self._report(progress, counts, done=False)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.concurrency, len(pending)) or 1)]
+        ticker = asyncio.ensure_future(reporter())
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            ticker.cancel()
+            for task in workers:
+                task.cancel()
+
+        await asyncio.wrap_future(self.db.execute(
+            "UPDATE broadcasts SET status = 'done', finished_at = ? WHERE id = ?", (time.time(), broadcast_id)
+        ))
+        counts = self.stats(broadcast_id)  # every target's write has landed, so this is the final word
+        print(f"[Broadcast] #{broadcast_id} finished: {counts[SENT]} sent, {counts[FAILED]} failed of {counts['total']}")
+        await self._report(progress, counts, done=True)
+        return counts
+
+    async def _report(self, progress, counts, done):
+        if progress is None:
+            return
+        try:
+            await progress(dict(counts), done)
+        except Exception as e:
+            print(f"[Broadcast] Progress callback failed: {e}")
+
+    async def _deliver(self, bot, broadcast_id, channel_id, content, embed):
+        channel = bot.get_channel(channel_id)
+        if channel is None:
+            await self._record(broadcast_id, str(channel_id), FAILED, 0, "channel not found")
+            return FAILED
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._acquire()
+            try:
+                await channel.send(content, embed=embed)
+            except Exception as e:
+                if attempt < self.max_attempts and _is_transient(e):
+                    await asyncio.sleep(BACKOFF_BASE * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+                    continue
+                await self._record(broadcast_id, str(channel_id), FAILED, attempt, str(e)[:200] or type(e).__name__)
+                return FAILED
+            await self._record(broadcast_id, str(channel_id), SENT, attempt)
+            return SENT
+
+    async def _acquire(self):
+        while True:
+            wait = self._bucket.delay(time.monotonic())
+            if wait <= 0:
+                self._bucket.take()
+                return
+            await asyncio.sleep(wait)
+
+
+# Shared instance used by the owner announcement commands
+broadcast_engine = BroadcastEngine()
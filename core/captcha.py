@@ -0,0 +1,194 @@
+import asyncio
+import functools
+import os
+import random
+import string
+import sys
+import time
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+from core.workers import worker_pool, JobTimeout, WorkerFailed
+
+FONT_PATH = os.getenv("CAPTCHA_FONT", "arial.ttf")
+FONT_SIZE = 36
+ALPHABET = string.ascii_uppercase + string.digits
+LENGTH = 5
+IMAGE_SIZE = (180, 60)
+GLYPH_CELL = (40, 50)
+ANGLES = range(-20, 21, 5)  # pre-rendered rotations, in degrees
+ADVANCE = 32                # horizontal step between glyphs
+
+# --- Ready-made pool ---
+POOL_SIZE = 200         # CAPTCHAs kept ready
+REFILL_BELOW = 50       # refilling starts once the pool drops under this
+RENDER_BATCH = 50       # CAPTCHAs rendered per worker job
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(path=FONT_PATH, size=FONT_SIZE):
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        print(f"[Captcha] Font {path} not found, using the default font")
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:  # Pillow < 10.1 has no sized default font
+            return ImageFont.load_default()
+
+
+class GlyphAtlas:
+    """Every character of the alphabet pre-rendered at every angle in ANGLES.
+
+    Built once per process; rendering a CAPTCHA is then only pasting glyphs
+    onto a blank image and encoding the PNG.
+    """
+
+    def __init__(self, font=None, alphabet=ALPHABET, angles=ANGLES):
+        font = font or load_font()
+        self.alphabet = alphabet
+        self.angles = tuple(angles)
+        self.glyphs = {}  # (char, angle) -> RGBA image
+        for ch in alphabet:
+            cell = Image.new("RGBA", GLYPH_CELL, (255, 255, 255, 0))
+            ImageDraw.Draw(cell).text((0, 0), ch, font=font, fill=(0, 0, 0))
+            for angle in self.angles:
+                self.glyphs[ch, angle] = cell.rotate(angle, expand=1)
+
+    def render(self, text, rng=random):
+        """PNG bytes of text drawn with a random pre-rendered rotation and height per glyph."""
+        img = Image.new("RGB", IMAGE_SIZE, "white")
+        x = 5
+        for ch in text:
+            glyph = self.glyphs[ch, rng.choice(self.angles)]
+            img.paste(glyph, (x, rng.randint(5, 15)), glyph)
+            x += ADVANCE
+        buf = BytesIO()
+        img.save(buf, "PNG", compress_level=1)  # fast; these images are tiny either way
+        return buf.getvalue()
+
+    def generate(self, rng=random):
+        text = "".join(rng.choices(self.alphabet, k=LENGTH))
+        return text, self.render(text, rng)
+
+    def generate_batch(self, count):
+        rng = random.Random()
+        return [self.generate(rng) for _ in range(count)]
+
+
+_atlas = None  # this process's GlyphAtlas, built on first use
+
+
+def render_batch(count):
+    """count fresh (text, png bytes) CAPTCHAs. Runs in worker processes, each with its own atlas."""
+    global _atlas
+    if _atlas is None:
+        _atlas = GlyphAtlas()
+    return _atlas.generate_batch(count)
+
+
+class CaptchaPool:
+    """A stock of ready CAPTCHAs so handing one out is just a dequeue.
+
+    Rendering holds the GIL, so it runs in the shared worker processes
+    (core.workers), never on the event loop, and batches render in
+    parallel on as many cores as the pool has workers. When the stock runs
+    low a single background task tops it up; if it is empty (a raid
+    draining it faster than it refills) get() renders one directly. Each
+    CAPTCHA is handed out at most once.
+    """
+
+    def __init__(self, size=POOL_SIZE, refill_below=REFILL_BELOW, batch=RENDER_BATCH, workers=worker_pool):
+        self.size = size
+        self.refill_below = refill_below
+        self.batch = batch
+        self.workers = workers
+        self._ready = []        # (text, png bytes); a plain list, only touched from the loop
+        self._refill_task = None
+        self.served = 0
+        self.misses = 0          # get() calls that found the pool empty
+
+    async def _render(self, count):
+        try:
+            return await self.workers.run(render_batch, count)
+        except (JobTimeout, WorkerFailed) as e:
+            print(f"[Captcha] Worker render failed ({e}); rendering in a thread")
+            return await asyncio.to_thread(render_batch, count)
+
+    def start(self):
+        """Fill the pool in the background (call from the running loop)."""
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.ensure_future(self._refill())
+
+    async def _refill(self):
+        try:
+            while len(self._ready) < self.size:
+                missing = self.size - len(self._ready)
+                counts = [min(self.batch, missing - i * self.batch) for i in range(self.workers.max_workers)]
+                for batch in await asyncio.gather(*(self._render(n) for n in counts if n > 0)):
+                    self._ready.extend(batch)
+        except Exception as e:
+            print(f"[Captcha] Pool refill failed: {e}")
+
+    async def get(self):
+        """A fresh (text, png bytes) CAPTCHA."""
+        self.served += 1
+        if self._ready:
+            captcha = self._ready.pop()
+        else:
+            self.misses += 1
+            captcha = (await self._render(1))[0]
+        if len(self._ready) < self.refill_below:
+            self.start()
+        return captcha
+
+    @property
+    def available(self):
+        return len(self._ready)
+
+    def close(self):
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+
+
+# Shared instance used by the CAPTCHA cog
+captcha_pool = CaptchaPool()
+
+
+# --- Benchmark: python -m core.captcha [count] ---
+async def _benchmark_pool(count):
+    pool = CaptchaPool(size=count, refill_below=0)
+    # Start the workers and build their atlases first
+    await asyncio.gather(*(pool._render(1) for _ in range(pool.workers.max_workers)))
+    start = time.perf_counter()
+    pool.start()
+    await pool._refill_task
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(count):
+        await pool.get()
+    served = time.perf_counter() - start
+    pool.close()
+    return elapsed, served
+
+
+def benchmark(count=1000):
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else count
+    start = time.perf_counter()
+    atlas = GlyphAtlas()
+    print(f"Atlas: {len(atlas.glyphs)} glyphs in {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    for _ in range(count):
+        atlas.generate()
+    elapsed = time.perf_counter() - start
+    print(f"Single thread: {count / elapsed:.0f} CAPTCHAs/s")
+
+    filled, served = asyncio.run(_benchmark_pool(count))
+    print(f"Pool refill ({worker_pool.max_workers} worker processes): {count / filled:.0f} CAPTCHAs/s")
+    print(f"Pool hand-out: {count / served:.0f} CAPTCHAs/s")
+
+
+if __name__ == "__main__":
+    benchmark()
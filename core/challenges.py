@@ -0,0 +1,155 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+CHALLENGE_TTL = 10 * 60     # seconds a member has to solve their CAPTCHA
+MAX_ATTEMPTS = 3            # wrong answers before the challenge is revoked
+COMPACT_INTERVAL = 60       # seconds between sweeps for expired challenges
+
+# --- Delivery batching ---
+BATCH_WINDOW = 2.0          # seconds joins are collected before the first message goes out
+MENTIONS_PER_MESSAGE = 40   # well under Discord's 2000-character content limit
+SEND_INTERVAL = 1.5         # seconds between messages in one guild (channels allow 5 per 5s)
+
+# --- Check results ---
+SOLVED = "solved"
+WRONG = "wrong"
+EXPIRED = "expired"     # no challenge, or it ran out
+LOCKED = "locked"       # too many wrong answers; the challenge is gone
+
+
+@dataclass
+class Challenge:
+    guild_id: int
+    user_id: int
+    role_id: int
+    expires: float
+    text: Optional[str] = None   # set when the member is shown an image
+    attempts: int = 0
+
+
+class ChallengeStore:
+    """Pending CAPTCHA challenges keyed by (guild, user).
+
+    Each challenge expires after `ttl` seconds and is revoked after
+    `max_attempts` wrong answers. Expired entries are dropped when looked
+    up and swept out every `compact_interval` seconds, so abandoned
+    challenges (members who never click) don't accumulate.
+    """
+
+    def __init__(self, ttl=CHALLENGE_TTL, max_attempts=MAX_ATTEMPTS, compact_interval=COMPACT_INTERVAL):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.compact_interval = compact_interval
+        self._challenges = {}  # (guild_id, user_id) -> Challenge
+        self._next_compact = time.monotonic() + compact_interval
+
+    def issue(self, guild_id, user_id, role_id):
+        """Start (or restart) a member's challenge."""
+        self._maybe_compact()
+        challenge = Challenge(guild_id, user_id, role_id, time.monotonic() + self.ttl)
+        self._challenges[guild_id, user_id] = challenge
+        return challenge
+
+    def get(self, guild_id, user_id):
+        """The member's live challenge, or None."""
+        self._maybe_compact()
+        challenge = self._challenges.get((guild_id, user_id))
+        if challenge is not None and challenge.expires <= time.monotonic():
+            del self._challenges[guild_id, user_id]
+            return None
+        return challenge
+
+    def check(self, guild_id, user_id, answer):
+        """Compare answer to the challenge's text. Returns (result, challenge)."""
+        challenge = self.get(guild_id, user_id)
+        if challenge is None or challenge.text is None:
+            return EXPIRED, challenge
+        if answer.strip().upper() == challenge.text.upper():
+            self.discard(guild_id, user_id)
+            return SOLVED, challenge
+        challenge.attempts += 1
+        if challenge.attempts >= self.max_attempts:
+            self.discard(guild_id, user_id)
+            return LOCKED, challenge
+        return WRONG, challenge
+
+    def discard(self, guild_id, user_id):
+        self._challenges.pop((guild_id, user_id), None)
+
+    def _maybe_compact(self):
+        now = time.monotonic()
+        if now >= self._next_compact:
+            self._next_compact = now + self.compact_interval
+            self.compact(now)
+
+    def compact(self, now=None):
+        """Drop every expired challenge. Returns how many were removed."""
+        now = now or time.monotonic()
+        expired = [key for key, c in self._challenges.items() if c.expires <= now]
+        for key in expired:
+            del self._challenges[key]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._challenges)
+
+
+class ChallengeQueue:
+    """Per-guild delivery queue that batches new challenges into shared messages.
+
+    Members queued within `window` seconds of each other are mentioned
+    together, up to `per_message` per message, and one guild's messages are
+    spaced `interval` seconds apart. A raid of N joins therefore costs about
+    N / per_message sends instead of N. `send` is an async
+    fn(guild_id, user_ids) supplied by the CAPTCHA cog.
+    """
+
+    def __init__(self, send=None, window=BATCH_WINDOW, per_message=MENTIONS_PER_MESSAGE, interval=SEND_INTERVAL):
+        self.send = send
+        self.window = window
+        self.per_message = per_message
+        self.interval = interval
+        self._pending = {}  # guild_id -> {user_id: None} (insertion-ordered, de-duplicated)
+        self._tasks = {}    # guild_id -> flusher Task
+        self.messages_sent = 0
+
+    def enqueue(self, guild_id, user_id):
+        pending = self._pending.setdefault(guild_id, {})
+        pending[user_id] = None
+        if guild_id not in self._tasks:
+            self._tasks[guild_id] = asyncio.ensure_future(self._flush(guild_id))
+
+    def queued(self, guild_id=None):
+        if guild_id is None:
+            return sum(len(p) for p in self._pending.values())
+        return len(self._pending.get(guild_id, ()))
+
+    async def _flush(self, guild_id):
+        try:
+            await asyncio.sleep(self.window)
+            while self._pending.get(guild_id):
+                pending = self._pending[guild_id]
+                batch = list(pending)[:self.per_message]
+                for user_id in batch:
+                    del pending[user_id]
+                try:
+                    await self.send(guild_id, batch)
+                    self.messages_sent += 1
+                except Exception as e:
+                    print(f"[Captcha] Could not deliver {len(batch)} challenges in guild {guild_id}: {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            self._tasks.pop(guild_id, None)
+            if not self._pending.get(guild_id):
+                self._pending.pop(guild_id, None)
+
+    def cancel(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+
+# Shared instances used by the CAPTCHA cog
+challenge_store = ChallengeStore()
+challenge_queue = ChallengeQueue()
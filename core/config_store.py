@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+from types import MappingProxyType
+
+from core.database import db, BLACKLIST_KEYS
+
+# How often (seconds) the store is allowed to check the database for outside changes
+CHECK_INTERVAL = 1.0
+
+EMPTY = MappingProxyType({})
+
+LIST_KEYS = {kind: key for key, kind in BLACKLIST_KEYS.items()}
+
+
+# --- Snapshot helpers ---
+def freeze(value):
+    """Return a read-only copy of a parsed JSON value (dicts -> mappingproxy, lists -> tuple)."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Return a plain, mutable copy of a frozen snapshot."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def diff_guild(gid, old, new):
+    """Row-level (sql, params) statements turning guild config `old` into `new`."""
+    ops = []
+    for key in old.keys() - new.keys():
+        if key in BLACKLIST_KEYS:
+            ops.append(("DELETE FROM guild_blacklist WHERE guild_id = ? AND kind = ?", (gid, BLACKLIST_KEYS[key])))
+        else:
+            ops.append(("DELETE FROM guild_config WHERE guild_id = ? AND key = ?", (gid, key)))
+
+    for key, value in new.items():
+        before = thaw(old.get(key))
+        if before == value:
+            continue
+        if key in BLACKLIST_KEYS:
+            kind = BLACKLIST_KEYS[key]
+            before = before or []
+            for item in before:
+                if item not in value:
+                    ops.append(("DELETE FROM guild_blacklist WHERE guild_id = ? AND kind = ? AND value = ?", (gid, kind, item)))
+            for item in value:
+                if item not in before:
+                    ops.append(("INSERT OR IGNORE INTO guild_blacklist (guild_id, kind, value) VALUES (?, ?, ?)", (gid, kind, item)))
+        else:
+            ops.append(("INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)", (gid, key, json.dumps(value))))
+    return ops
+
+
+class ConfigStore:
+    """In-memory view of every guild's config, shared by all cogs and the dashboard.
+
+    Reads are served from parsed, immutable snapshots. The database is only
+    re-read when another writer bumps the config revision; writes made through
+    the store update the snapshot immediately and are persisted row by row.
+    """
+
+    def __init__(self, database=db, check_interval=CHECK_INTERVAL):
+        self.db = database
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._guilds = EMPTY
+        self._db_revision = None
+        self._last_check = 0.0
+        self._pending = 0  # our own writes queued but not yet committed
+        self.revision = 0  # bumped every time the in-memory view changes
+
+    # --- Loading ---
+    def _refresh(self, immediate=False):
+        now = time.monotonic()
+        if not immediate and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if self._pending:
+                return  # the snapshot is ahead of the database until our writes land
+            self._last_check = now
+            conn = self.db._reader()
+            conn.execute("BEGIN")
+            try:
+                db_revision = int(conn.execute("SELECT value FROM meta WHERE key = 'config_revision'").fetchone()[0])
+                if db_revision == self._db_revision:
+                    return
+                guilds = {}
+                for row in conn.execute("SELECT guild_id, key, value FROM guild_config"):
+                    guilds.setdefault(row["guild_id"], {})[row["key"]] = json.loads(row["value"])
+                for row in conn.execute("SELECT guild_id, kind, value FROM guild_blacklist ORDER BY rowid"):
+                    guilds.setdefault(row["guild_id"], {}).setdefault(LIST_KEYS[row["kind"]], []).append(row["value"])
+            finally:
+                conn.execute("COMMIT")
+            self._guilds = MappingProxyType({gid: freeze(cfg) for gid, cfg in guilds.items()})
+            self._db_revision = db_revision
+            self.revision += 1
+
+    # --- Reads ---
+    def all(self):
+        """Snapshot of every guild config, keyed by guild id string."""
+        self._refresh()
+        return self._guilds
+
+    def get(self, guild_id):
+        """Snapshot of one guild's config (empty mapping if not configured)."""
+        self._refresh()
+        return self._guilds.get(str(guild_id), EMPTY)
+
+    def __contains__(self, guild_id):
+        return str(guild_id) in self.all()
+
+    # --- Writes ---
+    def _submit(self, ops):
+        if not ops:
+            return None
+
+        def apply(conn):
+            for sql, params in ops:
+                conn.execute(sql, params)
+            conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'config_revision'")
+            return int(conn.execute("SELECT value FROM meta WHERE key = 'config_revision'").fetchone()[0])
+
+        def written(future):
+            with self._lock:
+                self._pending -= 1
+                if future.exception() is None and self._db_revision is not None \
+                        and future.result() == self._db_revision + 1:
+                    # Our own write and nothing else in between: no need to re-read
+                    self._db_revision = future.result()
+                else:
+                    # Someone else wrote in between, or the write failed: re-read on next access
+                    self._db_revision = None
+                    self._last_check = 0.0
+
+        self._pending += 1
+        future = self.db.write(apply)
+        future.add_done_callback(written)
+        return future
+
+    def modify(self, guild_id, fn):
+        """Apply fn(mutable_guild_config) and persist the changed rows. Returns the new snapshot."""
+        gid = str(guild_id)
+        with self._lock:
+            self._refresh(immediate=True)
+            old = self._guilds.get(gid, EMPTY)
+            guild_config = thaw(old)
+            fn(guild_config)
+            self._guilds = MappingProxyType({**self._guilds, gid: freeze(guild_config)})
+            self.revision += 1
+            self._submit(diff_guild(gid, old, guild_config))
+            return self._guilds[gid]
+
+    def modify_all(self, fn):
+        """Apply fn(mutable_config_by_guild_id) and persist every changed row in one transaction."""
+        with self._lock:
+            self._refresh(immediate=True)
+            old = self._guilds
+            data = thaw(old)
+            fn(data)
+            ops = []
+            for gid in old.keys() - data.keys():
+                ops += diff_guild(gid, old[gid], {})
+            for gid, guild_config in data.items():
+                ops += diff_guild(gid, old.get(gid, EMPTY), guild_config)
+            self._guilds = MappingProxyType({gid: freeze(cfg) for gid, cfg in data.items()})
+            self.revision += 1
+            self._submit(ops)
+            return self._guilds
+
+    def update(self, guild_id, **fields):
+        """Set top-level fields on one guild's config."""
+        return self.modify(guild_id, lambda cfg: cfg.update(fields))
+
+    def delete(self, guild_id):
+        """Remove a guild's config. Returns False if it did not exist."""
+        gid = str(guild_id)
+        with self._lock:
+            self._refresh(immediate=True)
+            if gid not in self._guilds:
+                return False
+            self._guilds = MappingProxyType({k: v for k, v in self._guilds.items() if k != gid})
+            self.revision += 1
+            self._submit([
+                ("DELETE FROM guild_config WHERE guild_id = ?", (gid,)),
+                ("DELETE FROM guild_blacklist WHERE guild_id = ?", (gid,)),
+            ])
+            return True
+
+
+# Shared instance used by the bot and the dashboard
+config_store = ConfigStore()
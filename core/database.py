@@ -0,0 +1,290 @@
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+DB_FILE = "onyx.db"
+
+# Legacy JSON files imported the first time the database is created
+LEGACY_CONFIG_FILE = "server_config.json"
+LEGACY_OFFENSES_FILE = "offenses.json"
+LEGACY_METRICS_FILE = "server_metrics.json"
+
+# Guild config keys that are stored as rows in guild_blacklist instead of guild_config
+BLACKLIST_KEYS = {"blacklisted_domains": "domain", "blacklisted_keywords": "keyword"}
+
+# --- Schema migrations (index + 1 == PRAGMA user_version after applying) ---
+MIGRATIONS = [
+    """
+    CREATE TABLE meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE TABLE guild_config (
+        guild_id TEXT NOT NULL,
+        key      TEXT NOT NULL,
+        value    TEXT NOT NULL,
+        PRIMARY KEY (guild_id, key)
+    ) WITHOUT ROWID;
+    CREATE TABLE guild_blacklist (
+        guild_id TEXT NOT NULL,
+        kind     TEXT NOT NULL,
+        value    TEXT NOT NULL,
+        UNIQUE (guild_id, kind, value)
+    );
+    CREATE TABLE offenses (
+        guild_id TEXT NOT NULL,
+        user_id  TEXT NOT NULL,
+        count    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, user_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE metrics (
+        guild_id TEXT NOT NULL,
+        name     TEXT NOT NULL,
+        value    INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, name)
+    ) WITHOUT ROWID;
+    INSERT INTO meta (key, value) VALUES ('config_revision', '0');
+    """,
+    """
+    CREATE TABLE metric_buckets (
+        guild_id     TEXT NOT NULL,
+        name         TEXT NOT NULL,
+        granularity  TEXT NOT NULL,
+        bucket_start INTEGER NOT NULL,
+        value        INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (guild_id, name, granularity, bucket_start)
+    ) WITHOUT ROWID;
+    CREATE INDEX metric_buckets_age ON metric_buckets (granularity, bucket_start);
+    """,
+    """
+    CREATE TABLE offense_events (
+        id       INTEGER PRIMARY KEY,
+        guild_id TEXT NOT NULL,
+        user_id  TEXT NOT NULL,
+        ts       REAL NOT NULL,
+        reason   TEXT
+    );
+    CREATE INDEX offense_events_user ON offense_events (guild_id, user_id, ts);
+    CREATE INDEX offense_events_age ON offense_events (ts);
+    WITH RECURSIVE expand (guild_id, user_id, n) AS (
+        SELECT guild_id, user_id, count FROM offenses WHERE count > 0
+        UNION ALL
+        SELECT guild_id, user_id, n - 1 FROM expand WHERE n > 1
+    )
+    INSERT INTO offense_events (guild_id, user_id, ts, reason)
+    SELECT guild_id, user_id, CAST(strftime('%s', 'now') AS REAL), 'Imported offense count' FROM expand;
+    DROP TABLE offenses;
+    """,
+    """
+    CREATE TABLE url_verdicts (
+        url           TEXT PRIMARY KEY,
+        malicious     INTEGER NOT NULL DEFAULT 0,
+        suspicious    INTEGER NOT NULL DEFAULT 0,
+        harmless      INTEGER NOT NULL DEFAULT 0,
+        undetected    INTEGER NOT NULL DEFAULT 0,
+        malicious_by  TEXT NOT NULL DEFAULT '[]',
+        suspicious_by TEXT NOT NULL DEFAULT '[]',
+        vt_id         TEXT,
+        checked_at    REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX url_verdicts_age ON url_verdicts (checked_at);
+    """,
+    """
+    CREATE TABLE file_verdicts (
+        sha256     TEXT PRIMARY KEY,
+        flagged    INTEGER NOT NULL,
+        reason     TEXT,
+        malicious  INTEGER NOT NULL DEFAULT 0,
+        checked_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX file_verdicts_age ON file_verdicts (checked_at);
+    """,
+    """
+    CREATE TABLE broadcasts (
+        id          INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind        TEXT NOT NULL,
+        payload     TEXT NOT NULL,
+        status      TEXT NOT NULL DEFAULT 'running',
+        created_at  REAL NOT NULL,
+        finished_at REAL
+    );
+    CREATE TABLE broadcast_targets (
+        broadcast_id INTEGER NOT NULL,
+        channel_id   TEXT NOT NULL,
+        guild_id     TEXT,
+        state        TEXT NOT NULL DEFAULT 'pending',
+        attempts     INTEGER NOT NULL DEFAULT 0,
+        error        TEXT,
+        PRIMARY KEY (broadcast_id, channel_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX broadcasts_status ON broadcasts (status);
+    """,
+]
+
+
+def _load_legacy_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def import_legacy_json(conn):
+    """Copy server_config.json, offenses.json and server_metrics.json into a fresh database."""
+    config = _load_legacy_json(LEGACY_CONFIG_FILE)
+    for gid, guild_config in config.items():
+        for key, value in guild_config.items():
+            if key in BLACKLIST_KEYS:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO guild_blacklist (guild_id, kind, value) VALUES (?, ?, ?)",
+                    [(gid, BLACKLIST_KEYS[key], v) for v in value],
+                )
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO guild_config (guild_id, key, value) VALUES (?, ?, ?)",
+                    (gid, key, json.dumps(value)),
+                )
+
+    # Legacy offenses are bare counts: import each as an offense dated now
+    now = time.time()
+    offenses = _load_legacy_json(LEGACY_OFFENSES_FILE)
+    conn.executemany(
+        "INSERT INTO offense_events (guild_id, user_id, ts, reason) VALUES (?, ?, ?, 'Imported offense count')",
+        [(gid, uid, now) for gid, users in offenses.items() for uid, count in users.items() for _ in range(count)],
+    )
+
+    metrics = _load_legacy_json(LEGACY_METRICS_FILE)
+    conn.executemany(
+        "INSERT OR REPLACE INTO metrics (guild_id, name, value) VALUES (?, ?, ?)",
+        [(gid, name, value) for gid, values in metrics.items() for name, value in values.items()],
+    )
+
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_import', ?)", (str(int(time.time())),))
+    print(f"[Database] Imported {len(config)} guild configs, {len(offenses)} offense tables and {len(metrics)} metric rows from JSON")
+
+
+class Database:
+    """Embedded SQLite store (WAL mode) shared by the bot and the dashboard.
+
+    Reads use a per-thread connection and never block on writers. All writes
+    in a process are funnelled through one writer thread; SQLite's file lock
+    serialises the bot and dashboard processes against each other.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._open_lock = threading.Lock()
+
+    # --- Connections ---
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _reader(self):
+        self.open()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def open(self):
+        """Create/migrate the schema and start the writer thread (idempotent)."""
+        if self._writer is not None:
+            return
+        with self._open_lock:
+            if self._writer is not None:
+                return
+            conn = self._connect()
+            try:
+                self._migrate(conn)
+            finally:
+                conn.close()
+            self._writer = threading.Thread(target=self._writer_loop, name="db-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def _migrate(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            fresh = version == 0
+            for i, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in script.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version={i}")
+            if fresh:
+                import_legacy_json(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # --- Writer thread ---
+    def _writer_loop(self):
+        conn = self._connect()
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            fn, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    result = fn(conn)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except Exception as e:
+                print(f"[Database] Write failed: {e}")
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        conn.close()
+
+    # --- Public API ---
+    def write(self, fn):
+        """Queue fn(conn) to run in its own transaction on the writer thread. Returns a Future."""
+        self.open()
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def execute(self, sql, params=()):
+        """Queue a single write statement. Returns a Future of the affected row count."""
+        return self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    def query(self, sql, params=()):
+        """Run a read-only query on this thread's connection and return all rows."""
+        return self._reader().execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        return self._reader().execute(sql, params).fetchone()
+
+    def close(self):
+        """Flush queued writes and stop the writer thread."""
+        writer = self._writer
+        if writer is None:
+            return
+        self._queue.put(None)
+        writer.join()
+        self._writer = None
+
+
+# Shared instance used by the bot and the dashboard
+db = Database()
@@ -0,0 +1,77 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import tldextract
+
+# Optional local copy of the Public Suffix List; otherwise tldextract's bundled snapshot is used
+PSL_FILE = os.getenv("PSL_FILE")
+
+CACHE_SIZE = 50_000  # memoized hostnames
+
+
+class DomainParts(NamedTuple):
+    hostname: str
+    subdomain: str
+    domain: str
+    suffix: str
+
+    @property
+    def registered_domain(self):
+        """example.co.uk for www.example.co.uk ("" for IPs and bare suffixes)."""
+        return f"{self.domain}.{self.suffix}" if self.domain and self.suffix else ""
+
+    @property
+    def fqdn(self):
+        """The hostname if it sits under a known public suffix, else ""."""
+        return ".".join(p for p in (self.subdomain, self.domain, self.suffix) if p) if self.registered_domain else ""
+
+
+def hostname_of(url):
+    """Lowercased hostname of a URL (or of a bare hostname), "" if it has none."""
+    if "//" not in url:
+        url = f"//{url}"
+    try:
+        return (urlsplit(url).hostname or "").rstrip(".")
+    except ValueError:  # malformed IPv6 literal and the like
+        return ""
+
+
+class DomainParser:
+    """Offline registered-domain extraction with a bounded memo.
+
+    Uses the Public Suffix List snapshot bundled with tldextract (or a local
+    PSL_FILE) and never fetches anything, so startup is deterministic and a
+    repeated hostname costs one cache hit.
+    """
+
+    def __init__(self, psl_file=PSL_FILE, cache_size=CACHE_SIZE):
+        suffix_list_urls = (Path(psl_file).resolve().as_uri(),) if psl_file else ()
+        self._extract = tldextract.TLDExtract(suffix_list_urls=suffix_list_urls, cache_dir=None)
+        self._parse = lru_cache(maxsize=cache_size)(self._parse_hostname)
+
+    def _parse_hostname(self, hostname):
+        result = self._extract(hostname)
+        return DomainParts(hostname, result.subdomain, result.domain, result.suffix)
+
+    def parse(self, hostname) -> DomainParts:
+        return self._parse(hostname.strip().lower().rstrip("."))
+
+    def parse_url(self, url) -> DomainParts:
+        return self._parse(hostname_of(url))
+
+    def parse_many(self, hostnames):
+        """{hostname: DomainParts} for many hostnames at once, e.g. a blocklist import."""
+        return {hostname: self.parse(hostname) for hostname in dict.fromkeys(hostnames)}
+
+    def registered_domain(self, hostname):
+        return self.parse(hostname).registered_domain
+
+    def cache_info(self):
+        return self._parse.cache_info()
+
+
+# Shared instance used by the link detectors
+domain_parser = DomainParser()
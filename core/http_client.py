@@ -0,0 +1,68 @@
+import aiohttp
+
+# --- Pool settings ---
+CONNECTION_LIMIT = 100   # open connections across all hosts
+PER_HOST_LIMIT = 10      # open connections to any single host
+DNS_CACHE_TTL = 300      # seconds
+KEEPALIVE_TIMEOUT = 30   # seconds an idle connection is kept for reuse
+DEFAULT_TIMEOUT = 10     # seconds per request unless overridden
+
+# --- Downloads (attachments up to 25 MB) ---
+DOWNLOAD_TIMEOUT = 120       # seconds for the whole transfer
+DOWNLOAD_READ_TIMEOUT = 30   # seconds without receiving any data before giving up
+
+
+class HttpClient:
+    """One pooled aiohttp session for the whole bot.
+
+    Cogs get it as `bot.http_client` instead of opening a ClientSession per
+    request, so VirusTotal lookups and attachment downloads reuse warm
+    keep-alive connections. The session is created lazily on the bot's loop
+    and closed when the bot shuts down.
+    """
+
+    def __init__(self, limit=CONNECTION_LIMIT, limit_per_host=PER_HOST_LIMIT,
+                 dns_cache_ttl=DNS_CACHE_TTL, keepalive_timeout=KEEPALIVE_TIMEOUT, timeout=DEFAULT_TIMEOUT):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def download(self, url, **kwargs):
+        """GET for large bodies: a stalled transfer fails fast, a slow but steady one gets DOWNLOAD_TIMEOUT."""
+        kwargs.setdefault("timeout", aiohttp.ClientTimeout(
+            total=DOWNLOAD_TIMEOUT, sock_connect=DEFAULT_TIMEOUT, sock_read=DOWNLOAD_READ_TIMEOUT,
+        ))
+        return self.session.get(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.session.head(url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
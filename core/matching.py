@@ -0,0 +1,205 @@
+from collections import deque
+
+from core.urls import canonical_host
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed set of case-insensitive keywords.
+
+    Built once; scanning a text is a single pass whose cost does not depend
+    on how many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        self._goto = [{}]   # state -> {char: next state}
+        self._fail = [0]
+        self._out = [()]    # state -> keyword indices ending here
+        for index, keyword in enumerate(self.keywords):
+            self._add(keyword.lower(), index)
+        self._build()
+
+    def _add(self, word, index):
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (index,)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def finditer(self, text):
+        """Yield (start, keyword) for every occurrence, including overlapping ones."""
+        if not self.keywords:
+            return
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self.keywords
+        state = 0
+        for pos, ch in enumerate(text.lower()):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                keyword = keywords[index]
+                yield pos - len(keyword) + 1, keyword
+
+    def search(self, text):
+        """All hits as a list of (start, keyword), in the order they end in the text."""
+        return list(self.finditer(text))
+
+    def matched(self, text):
+        """Distinct keywords found in text, in order of first appearance."""
+        return list(dict.fromkeys(keyword for _, keyword in self.finditer(text)))
+
+
+class GuildKeywordMatchers:
+    """Per-guild KeywordMatcher (global + guild keywords), recompiled only when the guild list changes."""
+
+    def __init__(self, global_keywords):
+        self.global_keywords = tuple(global_keywords)
+        self._global = KeywordMatcher(self.global_keywords)
+        self._cache = {}  # guild_id -> (guild keywords, matcher)
+
+    def get(self, guild_id, guild_keywords):
+        guild_keywords = tuple(guild_keywords)
+        if not guild_keywords:
+            return self._global
+        cached = self._cache.get(guild_id)
+        if cached and (cached[0] is guild_keywords or cached[0] == guild_keywords):
+            return cached[1]
+        matcher = KeywordMatcher(self.global_keywords + guild_keywords)
+        self._cache[guild_id] = (guild_keywords, matcher)
+        return matcher
+
+
+# --- Domain rules ---
+ALLOW = "allow"
+DENY = "deny"
+
+
+def normalize_domain(domain):
+    """Canonical (lowercase, IDNA) domain/hostname without wildcards, leading or trailing dots."""
+    domain = domain.strip().lower()
+    if domain.startswith("*."):
+        domain = domain[2:]
+    # Empty labels ("x..evil.com", "evil.com.") are dropped, so they can't dodge a rule for evil.com
+    return canonical_host(".".join(label for label in domain.split(".") if label))
+
+
+class DomainTrie:
+    """Trie over reversed domain labels (com -> example -> www).
+
+    A rule for example.com covers example.com and every subdomain of it, but
+    not notexample.com. Lookups cost one step per label of the hostname.
+    """
+
+    _RULES = object()  # key holding a node's rules; can't collide with any label
+
+    def __init__(self, rules=()):
+        self._root = {}
+        for domain, verdict in rules:
+            self.add(domain, verdict)
+
+    def add(self, domain, verdict=DENY):
+        labels = normalize_domain(domain).split(".")
+        if not all(labels):
+            return
+        node = self._root
+        for label in reversed(labels):
+            node = node.setdefault(label, {})
+        node.setdefault(self._RULES, set()).add(verdict)
+
+    def remove(self, domain, verdict=DENY):
+        labels = normalize_domain(domain).split(".")
+        path = [self._root]
+        for label in reversed(labels):
+            node = path[-1].get(label)
+            if node is None:
+                return
+            path.append(node)
+        rules = path[-1].get(self._RULES)
+        if not rules:
+            return
+        rules.discard(verdict)
+        if not rules:
+            del path[-1][self._RULES]
+        # Prune now-empty branches
+        for label, parent, node in zip(labels, reversed(path[:-1]), reversed(path[1:])):
+            if node:
+                break
+            del parent[label]
+
+    def match(self, hostname):
+        """Most specific rule covering hostname as (depth, verdict, domain), or None.
+
+        Allow wins over deny when both are set on the same domain.
+        """
+        labels = normalize_domain(hostname).split(".")
+        node = self._root
+        best = None
+        for depth, label in enumerate(reversed(labels), start=1):
+            node = node.get(label)
+            if node is None:
+                break
+            rules = node.get(self._RULES)
+            if rules:
+                best = (depth, ALLOW if ALLOW in rules else DENY)
+        if best is None:
+            return None
+        depth, verdict = best
+        return depth, verdict, ".".join(labels[-depth:])
+
+
+class GuildDomainIndex:
+    """Global allow/deny rules plus one incrementally maintained deny trie per guild."""
+
+    def __init__(self, blacklisted, allowed):
+        self._global = DomainTrie([(d, DENY) for d in blacklisted] + [(d, ALLOW) for d in allowed])
+        self._guilds = {}  # guild_id -> (guild domains, DomainTrie)
+
+    def _guild_trie(self, guild_id, guild_domains):
+        guild_domains = tuple(guild_domains)
+        cached = self._guilds.get(guild_id)
+        if cached is None:
+            trie = DomainTrie([(d, DENY) for d in guild_domains])
+        elif cached[0] is guild_domains or cached[0] == guild_domains:
+            return cached[1]
+        else:
+            # Only apply what changed since the last snapshot
+            trie = cached[1]
+            old, new = set(cached[0]), set(guild_domains)
+            for domain in old - new:
+                trie.remove(domain, DENY)
+            for domain in new - old:
+                trie.add(domain, DENY)
+        self._guilds[guild_id] = (guild_domains, trie)
+        return trie
+
+    def resolve(self, guild_id, guild_domains, hostname):
+        """(verdict, matched domain) for hostname in this guild, or (None, None) if no rule applies."""
+        best = self._global.match(hostname)
+        if guild_domains:
+            local = self._guild_trie(guild_id, guild_domains).match(hostname)
+            if local and (best is None or local[0] > best[0]):
+                best = local
+        elif guild_id in self._guilds:
+            del self._guilds[guild_id]
+        if best is None:
+            return None, None
+        return best[1], best[2]
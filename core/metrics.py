@@ -0,0 +1,242 @@
+import atexit
+import glob
+import os
+import threading
+import time
+
+from core.database import db
+
+JOURNAL_FILE = "metrics.journal"
+
+FLUSH_INTERVAL = 10      # seconds between timed flushes (driven by SecurityCog)
+FLUSH_THRESHOLD = 200    # pending increments that force an early flush
+
+DEFAULT_METRICS = ("links_removed", "warnings_issued", "users_banned")
+
+# Rollup bucket sizes (seconds) and how long each granularity is kept
+GRANULARITIES = {"minute": 60, "hour": 3600, "day": 86400}
+RETENTION = {"minute": 2 * 86400, "hour": 90 * 86400}
+PRUNE_INTERVAL = 3600
+
+
+def bucket_start(ts, granularity):
+    size = GRANULARITIES[granularity]
+    return int(ts) - int(ts) % size
+
+
+# --- Read helpers (safe to use from the dashboard process) ---
+def query_totals(guild_id=None, database=db):
+    """Lifetime totals as {guild_id: {metric: value}} (or one guild's dict)."""
+    if guild_id is None:
+        rows = database.query("SELECT guild_id, name, value FROM metrics")
+    else:
+        rows = database.query("SELECT guild_id, name, value FROM metrics WHERE guild_id = ?", (str(guild_id),))
+    totals = {}
+    for row in rows:
+        totals.setdefault(row["guild_id"], dict.fromkeys(DEFAULT_METRICS, 0))[row["name"]] = row["value"]
+    if guild_id is None:
+        return totals
+    return totals.get(str(guild_id), dict.fromkeys(DEFAULT_METRICS, 0))
+
+
+def query_series(guild_id, name, granularity="hour", points=24, now=None, database=db):
+    """Last `points` buckets for one metric as [(bucket_start, value)], oldest first, zero-filled."""
+    size = GRANULARITIES[granularity]
+    end = bucket_start(now or time.time(), granularity)
+    start = end - (points - 1) * size
+    rows = database.query(
+        "SELECT bucket_start, value FROM metric_buckets "
+        "WHERE guild_id = ? AND name = ? AND granularity = ? AND bucket_start >= ?",
+        (str(guild_id), name, granularity, start),
+    )
+    values = {row["bucket_start"]: row["value"] for row in rows}
+    return [(ts, values.get(ts, 0)) for ts in range(start, end + size, size)]
+
+
+class MetricsRecorder:
+    """Write-behind metric counters with per-minute/hour/day rollups.
+
+    Increments land in memory and in an append-only journal, and are written
+    to the database in one transaction on a timer or once enough pile up.
+    Journal files are only deleted after the transaction that contains them
+    commits, so a crash loses nothing; replay skips sequence numbers the
+    database has already recorded. Only one flush is in flight at a time,
+    so a failed flush can't be overtaken by a later one that records a
+    higher sequence number than the increments it failed to write.
+    """
+
+    def __init__(self, database=db, journal_path=JOURNAL_FILE, flush_threshold=FLUSH_THRESHOLD):
+        self.db = database
+        self.journal_path = journal_path
+        self.flush_threshold = flush_threshold
+        self._lock = threading.RLock()
+        self._totals = None
+        self._pending_totals = {}   # (guild_id, name) -> amount
+        self._pending_buckets = {}  # (guild_id, name, granularity, bucket_start) -> amount
+        self._pending_count = 0
+        self._seq = 0
+        self._journal = None
+        self._unflushed_files = []  # rotated journal files not yet committed to the database
+        self._flushing = None       # Future of the flush in flight
+        self._last_prune = 0.0
+
+    # --- Startup / journal ---
+    def _ensure_loaded(self):
+        if self._totals is not None:
+            return
+        with self._lock:
+            if self._totals is not None:
+                return
+            self._totals = query_totals(database=self.db)
+            row = self.db.query_one("SELECT value FROM meta WHERE key = 'metrics_journal_seq'")
+            flushed_seq = int(row["value"]) if row else 0
+            self._seq = flushed_seq
+
+            replayed = 0
+            for path in sorted(glob.glob(f"{self.journal_path}*")):
+                file_seq = 0
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            seq, ts, gid, name, amount = line.split()
+                            seq, ts, amount = int(seq), float(ts), int(amount)
+                        except ValueError:
+                            continue  # torn final line from a crash
+                        file_seq = max(file_seq, seq)
+                        if seq > flushed_seq:
+                            self._apply(gid, name, amount, ts)
+                            replayed += 1
+                self._seq = max(self._seq, file_seq)
+                if path == self.journal_path:
+                    if not file_seq:
+                        os.remove(path)
+                        continue
+                    rotated = f"{path}.{file_seq:012d}"
+                    os.replace(path, rotated)
+                    path = rotated
+                self._unflushed_files.append(path)
+            if replayed:
+                print(f"[Metrics] Replayed {replayed} journaled increments")
+
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            atexit.register(self.flush)
+
+    def _apply(self, gid, name, amount, ts):
+        guild_totals = self._totals.setdefault(gid, dict.fromkeys(DEFAULT_METRICS, 0))
+        guild_totals[name] = guild_totals.get(name, 0) + amount
+        key = (gid, name)
+        self._pending_totals[key] = self._pending_totals.get(key, 0) + amount
+        for granularity in GRANULARITIES:
+            key = (gid, name, granularity, bucket_start(ts, granularity))
+            self._pending_buckets[key] = self._pending_buckets.get(key, 0) + amount
+        self._pending_count += 1
+
+    # --- Public API ---
+    def incr(self, guild_id, name, amount=1):
+        """Count `amount` of `name` for a guild. Cheap: memory + one journal append."""
+        self._ensure_loaded()
+        gid = str(guild_id)
+        now = time.time()
+        with self._lock:
+            self._seq += 1
+            self._journal.write(f"{self._seq} {now:.3f} {gid} {name} {amount}\n")
+            self._journal.flush()
+            self._apply(gid, name, amount, now)
+            should_flush = self._pending_count >= self.flush_threshold
+        if should_flush:
+            self.flush()
+
+    def totals(self, guild_id):
+        """Lifetime totals for a guild, including increments not yet flushed."""
+        self._ensure_loaded()
+        return dict(self._totals.get(str(guild_id), dict.fromkeys(DEFAULT_METRICS, 0)))
+
+    def series(self, guild_id, name, granularity="hour", points=24):
+        """Like query_series, but including increments not yet flushed."""
+        self._ensure_loaded()
+        gid = str(guild_id)
+        series = query_series(gid, name, granularity, points, database=self.db)
+        with self._lock:
+            return [
+                (ts, value + self._pending_buckets.get((gid, name, granularity, ts), 0))
+                for ts, value in series
+            ]
+
+    def recent(self, guild_id, name, seconds):
+        """Count of `name` over roughly the last `seconds` (minute buckets up to 2 days, hours beyond)."""
+        granularity = "minute" if seconds <= RETENTION["minute"] else "hour"
+        points = max(1, seconds // GRANULARITIES[granularity])
+        return sum(value for _, value in self.series(guild_id, name, granularity, points))
+
+    def flush(self):
+        """Write pending counts to the database. Returns the write Future, or None if idle.
+
+        While an earlier flush is still in flight its Future is returned instead;
+        the counts stay pending for the next flush.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if self._flushing is not None and not self._flushing.done():
+                return self._flushing
+            if not self._pending_count:
+                return None
+            totals, buckets, seq, count = self._pending_totals, self._pending_buckets, self._seq, self._pending_count
+            self._pending_totals, self._pending_buckets, self._pending_count = {}, {}, 0
+
+            # Rotate the journal so the flushed entries can be dropped once committed
+            self._journal.close()
+            rotated = f"{self.journal_path}.{seq:012d}"
+            os.replace(self.journal_path, rotated)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            files, self._unflushed_files = self._unflushed_files + [rotated], []
+
+            prune = time.time() - self._last_prune >= PRUNE_INTERVAL
+            if prune:
+                self._last_prune = time.time()
+
+            def apply(conn):
+                conn.executemany(
+                    "INSERT INTO metrics (guild_id, name, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (guild_id, name) DO UPDATE SET value = value + excluded.value",
+                    [(gid, name, amount) for (gid, name), amount in totals.items()],
+                )
+                conn.executemany(
+                    "INSERT INTO metric_buckets (guild_id, name, granularity, bucket_start, value) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (guild_id, name, granularity, bucket_start) "
+                    "DO UPDATE SET value = value + excluded.value",
+                    [(gid, name, gran, start, amount) for (gid, name, gran, start), amount in buckets.items()],
+                )
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('metrics_journal_seq', ?)", (str(seq),))
+                if prune:
+                    now = time.time()
+                    for granularity, keep in RETENTION.items():
+                        conn.execute(
+                            "DELETE FROM metric_buckets WHERE granularity = ? AND bucket_start < ?",
+                            (granularity, int(now - keep)),
+                        )
+
+            def written(future):
+                if future.exception():
+                    # Put the counts back so the next flush retries them with the same journal files
+                    with self._lock:
+                        for key, amount in totals.items():
+                            self._pending_totals[key] = self._pending_totals.get(key, 0) + amount
+                        for key, amount in buckets.items():
+                            self._pending_buckets[key] = self._pending_buckets.get(key, 0) + amount
+                        self._pending_count += count
+                        self._unflushed_files = files + self._unflushed_files
+                    return
+                for path in files:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+            # Queued under the lock, so two threads can't both get past the in-flight check
+            self._flushing = future = self.db.write(apply)
+        future.add_done_callback(written)
+        return future
+
+
+# Shared instance used by the bot
+metrics_recorder = MetricsRecorder()
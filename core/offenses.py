@@ -0,0 +1,118 @@
+import bisect
+import heapq
+import threading
+import time
+
+from core.database import db
+
+# Offenses older than this are dropped from memory and the database
+RETENTION_HOURS = 30 * 24
+
+# Default escalation window, overridable per guild with "offense_window_hours"
+DEFAULT_WINDOW_HOURS = 7 * 24
+
+SWEEP_INTERVAL = 10 * 60  # seconds between background expiry sweeps (driven by SecurityCog)
+
+
+class OffenseLedger:
+    """Per-(guild, user) offense history with time-windowed counts.
+
+    Only users who actually offended have an entry. Each entry is a list of
+    (timestamp, reason) in time order, so "offenses in the last N hours" is a
+    bisect. An expiry heap lets the sweep touch only entries with old offenses.
+    """
+
+    def __init__(self, database=db, retention_hours=RETENTION_HOURS):
+        self.db = database
+        self.retention = retention_hours * 3600
+        self._lock = threading.Lock()
+        self._events = None  # (guild_id, user_id) -> [(ts, reason), ...]
+        self._expiry = []    # heap of (oldest ts + retention, guild_id, user_id)
+
+    def _ensure_loaded(self):
+        if self._events is not None:
+            return
+        with self._lock:
+            if self._events is not None:
+                return
+            events = {}
+            cutoff = time.time() - self.retention
+            for row in self.db.query(
+                "SELECT guild_id, user_id, ts, reason FROM offense_events WHERE ts >= ? ORDER BY ts", (cutoff,)
+            ):
+                events.setdefault((row["guild_id"], row["user_id"]), []).append((row["ts"], row["reason"]))
+            self._expiry = [(entries[0][0] + self.retention, gid, uid) for (gid, uid), entries in events.items()]
+            heapq.heapify(self._expiry)
+            self._events = events
+
+    # --- Public API ---
+    def record(self, guild_id, user_id, reason, window_hours=DEFAULT_WINDOW_HOURS):
+        """Record one offense and return how many the user has within the window (including this one)."""
+        self._ensure_loaded()
+        key = (str(guild_id), str(user_id))
+        now = time.time()
+        with self._lock:
+            entries = self._events.get(key)
+            if entries is None:
+                entries = self._events[key] = []
+                heapq.heappush(self._expiry, (now + self.retention, *key))
+            entries.append((now, reason))
+            count = self._count_since(entries, now - window_hours * 3600)
+        self.db.execute(
+            "INSERT INTO offense_events (guild_id, user_id, ts, reason) VALUES (?, ?, ?, ?)",
+            (key[0], key[1], now, reason),
+        )
+        return count
+
+    def count_recent(self, guild_id, user_id, hours=DEFAULT_WINDOW_HOURS):
+        """Number of offenses the user committed in the last `hours`."""
+        self._ensure_loaded()
+        with self._lock:
+            entries = self._events.get((str(guild_id), str(user_id)))
+            if not entries:
+                return 0
+            return self._count_since(entries, time.time() - hours * 3600)
+
+    def history(self, guild_id, user_id):
+        """All retained offenses for a user as [(timestamp, reason)], oldest first."""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._events.get((str(guild_id), str(user_id)), ()))
+
+    def clear(self, guild_id, user_id):
+        """Forget a user's offenses in one guild."""
+        self._ensure_loaded()
+        key = (str(guild_id), str(user_id))
+        with self._lock:
+            self._events.pop(key, None)
+        self.db.execute("DELETE FROM offense_events WHERE guild_id = ? AND user_id = ?", key)
+
+    def sweep(self):
+        """Drop offenses older than the retention period. Returns how many users were touched."""
+        self._ensure_loaded()
+        now = time.time()
+        cutoff = now - self.retention
+        touched = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                deadline, gid, uid = heapq.heappop(self._expiry)
+                entries = self._events.get((gid, uid))
+                if not entries or entries[0][0] + self.retention != deadline:
+                    continue  # stale: the user was cleared (and may have re-offended) since this was pushed
+                keep = bisect.bisect_left(entries, (cutoff,))
+                del entries[:keep]
+                touched += 1
+                if entries:
+                    heapq.heappush(self._expiry, (entries[0][0] + self.retention, gid, uid))
+                else:
+                    del self._events[(gid, uid)]
+        self.db.execute("DELETE FROM offense_events WHERE ts < ?", (cutoff,))
+        return touched
+
+    @staticmethod
+    def _count_since(entries, since):
+        return len(entries) - bisect.bisect_left(entries, (since,))
+
+
+# Shared instance used by the bot
+offense_ledger = OffenseLedger()
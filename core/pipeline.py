@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import discord
+
+from core.config_store import config_store
+from core.urls import extract_urls
+
+# How many recent message ids are remembered for de-duplication
+DEDUP_SIZE = 10_000
+
+
+@dataclass
+class Verdict:
+    """One detector's finding about a message."""
+    detector: str
+    reason: str
+    delete: bool = True                    # remove the message
+    warn: bool = True                      # count an offense against the author
+    metric: Optional[str] = None           # metric to increment for the guild
+    embed: Optional[discord.Embed] = None  # alert to post in the guild's alert channel
+
+
+class ScanContext:
+    """A message parsed once and shared by every detector."""
+
+    def __init__(self, message: discord.Message):
+        self.message = message
+        self.guild = message.guild
+        self.guild_config = config_store.get(message.guild.id)
+        self.content = message.content
+        self.urls = extract_urls(message.content)
+        self.attachments = message.attachments
+
+
+class RecentIds:
+    """Bounded set of recently seen ids (oldest evicted first)."""
+
+    def __init__(self, maxsize=DEDUP_SIZE):
+        self.maxsize = maxsize
+        self._ids = OrderedDict()
+
+    def add(self, item):
+        """Remember item; returns False if it was already present."""
+        if item in self._ids:
+            return False
+        self._ids[item] = None
+        if len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+        return True
+
+    def __contains__(self, item):
+        return item in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class MessagePipeline:
+    """Runs every registered detector over a message exactly once.
+
+    Detectors are async callables taking a ScanContext and returning a
+    Verdict, a list of Verdicts or None. They run cheapest first; once one
+    asks for the message to be deleted, costlier detectors are skipped. All
+    verdicts are handed to `executor` as one moderation decision.
+    """
+
+    def __init__(self, dedup_size=DEDUP_SIZE):
+        self._detectors = {}  # name -> (cost, fn)
+        self._order = []
+        self.seen = RecentIds(dedup_size)
+        self.removed = RecentIds(dedup_size)  # messages already deleted by a decision
+        self.executor = None  # async fn(message, verdicts)
+
+    def register(self, name, fn, cost):
+        self._detectors[name] = (cost, fn)
+        self._order = sorted(self._detectors.items(), key=lambda item: item[1][0])
+
+    def unregister(self, name):
+        if self._detectors.pop(name, None):
+            self._order = sorted(self._detectors.items(), key=lambda item: item[1][0])
+
+    async def process(self, message: discord.Message):
+        if message.author.bot or not message.guild:
+            return []
+        if not self.seen.add(message.id):
+            return []
+
+        ctx = ScanContext(message)
+        verdicts = []
+        for name, (cost, fn) in self._order:
+            try:
+                result = await fn(ctx)
+            except Exception as e:
+                print(f"[Pipeline] Detector {name} failed on message {message.id}: {e}")
+                continue
+            if result is None:
+                continue
+            found = result if isinstance(result, list) else [result]
+            verdicts.extend(found)
+            if any(v.delete for v in found):
+                break
+
+        if verdicts:
+            await self.apply(message, verdicts)
+        return verdicts
+
+    async def apply(self, message: discord.Message, verdicts):
+        """Act on verdicts; also used for verdicts that arrive after process() returned."""
+        if self.executor is None or not verdicts:
+            return
+        if message.id in self.removed:
+            return  # a late verdict for a message that was already dealt with
+        if any(v.delete for v in verdicts):
+            self.removed.add(message.id)
+        await self.executor(message, verdicts)
+
+
+# Shared instance; SecurityCog owns the on_message listener and the executor
+message_pipeline = MessagePipeline()
@@ -0,0 +1,23 @@
+import time
+
+
+class TokenBucket:
+    """`capacity` requests per `period` seconds, refilled continuously."""
+
+    def __init__(self, capacity, period):
+        self.capacity = max(1, capacity)
+        self.rate = self.capacity / period
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now):
+        """Seconds until one token is available."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
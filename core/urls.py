@@ -0,0 +1,98 @@
+import re
+from urllib.parse import unquote, unquote_plus, urlsplit, urlunsplit
+
+# --- Regex for masked [text](url) and raw URLs ---
+URL_REGEX = re.compile(
+    r'\[.*?\]\((https?://[^\s]+)\)|'  # masked link
+    r'(https?://[^\s]+)'              # raw url
+)
+
+# Query parameters that only track the click and never change the target
+TRACKING_PARAMS = {
+    "utm", "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid", "ttclid",
+    "igshid", "igsh", "si", "mc_cid", "mc_eid", "mkt_tok", "_hsenc", "_hsmi", "ref_src", "ref_url",
+    "s_cid", "spm", "scm", "vero_id", "oly_anon_id", "oly_enc_id", "rb_clickid", "wt.mc_id",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+# Characters Discord markdown and prose leave glued to the end of a URL
+TRAILING_JUNK = ".,;:!?'\"*_~`|>]}"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_UNRESERVED = re.compile(r"%([0-9A-Fa-f]{2})")
+
+
+def _normalize_escape(match):
+    char = chr(int(match.group(1), 16))
+    if char.isalnum() and char.isascii() or char in "-._~":
+        return char
+    return f"%{match.group(1).upper()}"
+
+
+def _strip_junk(url):
+    url = url.lstrip("<")
+    while url:
+        if url[-1] in TRAILING_JUNK:
+            url = url[:-1]
+        elif url[-1] == ")" and url.count(")") > url.count("("):
+            url = url[:-1]  # closing paren of the surrounding text, not of the URL
+        else:
+            break
+    return url
+
+
+def canonical_host(host):
+    """Lowercase, percent-decoded, IDNA (punycode) form of a hostname."""
+    host = unquote(host).strip().lower().rstrip(".")
+    try:
+        # Round-trip so xn-- labels and their Unicode spelling end up identical
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return host
+
+
+def canonicalize_url(url):
+    """Canonical form of url used as the key for every lookup, or None if it isn't a usable http(s) URL.
+
+    Hosts are lowercased and IDNA-encoded, default ports, credentials,
+    fragments and tracking parameters are dropped, and percent-escapes of
+    unreserved characters are decoded.
+    """
+    url = _strip_junk(url.strip())
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = canonical_host(parts.hostname)
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    path = _UNRESERVED.sub(_normalize_escape, parts.path) or "/"
+    query = "&".join(
+        param for param in parts.query.split("&")
+        if param and not _is_tracking(param)
+    )
+    return urlunsplit((scheme, netloc, path, _UNRESERVED.sub(_normalize_escape, query), ""))
+
+
+def _is_tracking(param):
+    name = unquote_plus(param.split("=", 1)[0]).lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def extract_urls(text: str):
+    """Distinct canonical URLs in text, in order of first appearance."""
+    matches = URL_REGEX.findall(text)
+    urls = {}
+    for m in matches:
+        raw = m[0] or m[1] if isinstance(m, tuple) else m
+        url = canonicalize_url(raw) if raw else None
+        if url:
+            urls[url] = None
+    return list(urls)
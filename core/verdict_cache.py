@@ -0,0 +1,229 @@
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from core.database import db
+
+MAX_ENTRIES = 10_000          # verdicts kept in memory (least recently used evicted first)
+POSITIVE_TTL = 24 * 60 * 60   # flagged URLs stay flagged for a day
+NEGATIVE_TTL = 60 * 60        # clean or unknown URLs are re-checked after an hour
+PRUNE_INTERVAL = 60 * 60      # seconds between deletes of expired rows
+
+FILE_MAX_ENTRIES = 10_000
+FILE_POSITIVE_TTL = 7 * 24 * 60 * 60  # file contents never change, so a flagged file stays flagged
+FILE_NEGATIVE_TTL = 60 * 60           # new malware is often unknown to VirusTotal at first: re-check clean files
+
+
+@dataclass(frozen=True)
+class UrlVerdict:
+    """Compact VirusTotal result for one URL (the full report is never kept)."""
+    url: str
+    malicious: int = 0
+    suspicious: int = 0
+    harmless: int = 0
+    undetected: int = 0
+    malicious_by: tuple = ()     # vendor names
+    suspicious_by: tuple = ()
+    vt_id: Optional[str] = None  # None when VirusTotal has no report for the URL
+    checked_at: float = 0.0
+
+    @property
+    def positive(self):
+        return bool(self.malicious or self.suspicious)
+
+    @property
+    def total(self):
+        return self.malicious + self.suspicious + self.harmless + self.undetected
+
+    @property
+    def permalink(self):
+        return f"https://www.virustotal.com/gui/url/{self.vt_id}" if self.vt_id else None
+
+    @classmethod
+    def from_report(cls, url, data, checked_at=None):
+        """Build a verdict from a /urls/{id} response (None = not found)."""
+        checked_at = checked_at or time.time()
+        if not data:
+            return cls(url, checked_at=checked_at)
+        attributes = data.get("data", {}).get("attributes", {})
+        by_category = {"malicious": [], "suspicious": [], "harmless": [], "undetected": []}
+        for vendor, info in attributes.get("last_analysis_results", {}).items():
+            names = by_category.get(info.get("category"))
+            if names is not None:
+                names.append(vendor)
+        stats = attributes.get("last_analysis_stats", {})
+        # Prefer the per-vendor breakdown, fall back to the summary counts
+        counts = {k: len(v) or stats.get(k, 0) for k, v in by_category.items()}
+        return cls(
+            url,
+            malicious=counts["malicious"],
+            suspicious=counts["suspicious"],
+            harmless=counts["harmless"],
+            undetected=counts["undetected"],
+            malicious_by=tuple(by_category["malicious"]),
+            suspicious_by=tuple(by_category["suspicious"]),
+            vt_id=data.get("data", {}).get("id"),
+            checked_at=checked_at,
+        )
+
+
+class VerdictCache:
+    """Bounded LRU of UrlVerdicts, written through to the url_verdicts table.
+
+    Positive and negative results expire on separate TTLs. On first use the
+    most recent unexpired rows are loaded, so a restart starts warm.
+    """
+
+    def __init__(self, database=db, max_entries=MAX_ENTRIES, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.db = database
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._entries = None  # url -> UrlVerdict, least recently used first
+        self._last_prune = 0.0
+
+    def _ensure_loaded(self):
+        if self._entries is not None:
+            return
+        entries = OrderedDict()
+        now = time.time()
+        rows = self.db.query(
+            "SELECT * FROM url_verdicts WHERE checked_at >= ? ORDER BY checked_at DESC LIMIT ?",
+            (now - max(self.positive_ttl, self.negative_ttl), self.max_entries),
+        )
+        for row in reversed(rows):
+            verdict = UrlVerdict(
+                row["url"],
+                malicious=row["malicious"],
+                suspicious=row["suspicious"],
+                harmless=row["harmless"],
+                undetected=row["undetected"],
+                malicious_by=tuple(json.loads(row["malicious_by"])),
+                suspicious_by=tuple(json.loads(row["suspicious_by"])),
+                vt_id=row["vt_id"],
+                checked_at=row["checked_at"],
+            )
+            if not self._expired(verdict, now):
+                entries[verdict.url] = verdict
+        self._entries = entries
+        self.prune()
+
+    def _expired(self, verdict, now):
+        ttl = self.positive_ttl if verdict.positive else self.negative_ttl
+        return now - verdict.checked_at >= ttl
+
+    # --- Public API ---
+    def get(self, url):
+        """Cached verdict for url, or None if missing or expired."""
+        self._ensure_loaded()
+        verdict = self._entries.get(url)
+        if verdict is None:
+            return None
+        if self._expired(verdict, time.time()):
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return verdict
+
+    def put(self, verdict: UrlVerdict):
+        self._ensure_loaded()
+        self._entries[verdict.url] = verdict
+        self._entries.move_to_end(verdict.url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.db.execute(
+            "INSERT OR REPLACE INTO url_verdicts (url, malicious, suspicious, harmless, undetected, "
+            "malicious_by, suspicious_by, vt_id, checked_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                verdict.url, verdict.malicious, verdict.suspicious, verdict.harmless, verdict.undetected,
+                json.dumps(verdict.malicious_by), json.dumps(verdict.suspicious_by), verdict.vt_id, verdict.checked_at,
+            ),
+        )
+        if time.time() - self._last_prune >= PRUNE_INTERVAL:
+            self.prune()
+        return verdict
+
+    def prune(self):
+        """Delete rows that can no longer be served."""
+        self._last_prune = time.time()
+        now = time.time()
+        return self.db.execute(
+            "DELETE FROM url_verdicts WHERE "
+            "CASE WHEN malicious > 0 OR suspicious > 0 THEN checked_at < ? ELSE checked_at < ? END",
+            (now - self.positive_ttl, now - self.negative_ttl),
+        )
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._entries)
+
+
+@dataclass(frozen=True)
+class FileVerdict:
+    """Outcome of scanning one file's contents, keyed by SHA-256."""
+    sha256: str
+    flagged: bool
+    reason: Optional[str] = None
+    malicious: int = 0  # VirusTotal engines that flagged the hash
+    checked_at: float = 0.0
+
+
+class FileVerdictCache:
+    """Bounded LRU of FileVerdicts, written through to the file_verdicts table.
+
+    Lets a reposted file be resolved from its hash alone. Like VerdictCache,
+    flagged and clean results expire on separate TTLs, so a clean file goes
+    back to VirusTotal after a while. Rows are read from the database on a
+    miss, so verdicts survive restarts without being loaded up front.
+    """
+
+    def __init__(self, database=db, max_entries=FILE_MAX_ENTRIES, positive_ttl=FILE_POSITIVE_TTL,
+                 negative_ttl=FILE_NEGATIVE_TTL):
+        self.db = database
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()  # sha256 -> FileVerdict
+        self._last_prune = 0.0
+
+    def get(self, sha256):
+        verdict = self._entries.get(sha256)
+        if verdict is None:
+            row = self.db.query_one("SELECT * FROM file_verdicts WHERE sha256 = ?", (sha256,))
+            if row is None:
+                return None
+            verdict = FileVerdict(row["sha256"], bool(row["flagged"]), row["reason"], row["malicious"], row["checked_at"])
+            self._remember(verdict)
+        ttl = self.positive_ttl if verdict.flagged else self.negative_ttl
+        if time.time() - verdict.checked_at >= ttl:
+            del self._entries[sha256]
+            return None
+        self._entries.move_to_end(sha256)
+        return verdict
+
+    def put(self, verdict: FileVerdict):
+        self._remember(verdict)
+        self.db.execute(
+            "INSERT OR REPLACE INTO file_verdicts (sha256, flagged, reason, malicious, checked_at) VALUES (?, ?, ?, ?, ?)",
+            (verdict.sha256, int(verdict.flagged), verdict.reason, verdict.malicious, verdict.checked_at),
+        )
+        if time.time() - self._last_prune >= PRUNE_INTERVAL:
+            self._last_prune = now = time.time()
+            self.db.execute(
+                "DELETE FROM file_verdicts WHERE CASE WHEN flagged THEN checked_at < ? ELSE checked_at < ? END",
+                (now - self.positive_ttl, now - self.negative_ttl),
+            )
+        return verdict
+
+    def _remember(self, verdict):
+        self._entries[verdict.sha256] = verdict
+        self._entries.move_to_end(verdict.sha256)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Shared instances used by the VirusTotal client and the attachment scanner
+verdict_cache = VerdictCache()
+file_verdict_cache = FileVerdictCache()
@@ -0,0 +1,188 @@
+import asyncio
+import base64
+import heapq
+import itertools
+import os
+import random
+import time
+
+import aiohttp
+
+from core.ratelimit import TokenBucket
+from core.verdict_cache import verdict_cache, UrlVerdict
+
+VT_API_URL = "https://www.virustotal.com/api/v3"
+
+# Account quota (public API defaults), overridable from the environment
+RATE_PER_MINUTE = int(os.getenv("VT_RATE_PER_MINUTE", "4"))
+RATE_PER_DAY = int(os.getenv("VT_RATE_PER_DAY", "500"))
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 2.0   # seconds; doubled on every retry
+BACKOFF_MAX = 60.0
+
+# Priority lanes: lower goes first
+PRIORITY_LIVE = 0    # messages being scanned right now
+PRIORITY_USER = 1    # on-demand lookups such as /checklink
+
+SCAN_MAX_WAIT = 5.0  # seconds an attachment scan waits for a request slot before going on without VT
+
+
+def encode_url_to_vt_id(url):
+    return base64.urlsafe_b64encode(url.encode("utf-8")).decode().rstrip("=")
+
+
+class VirusTotalError(Exception):
+    """A lookup that failed (quota, network, server error) — not a clean result."""
+
+
+class RequestScheduler:
+    """Hands out request slots within every quota bucket, best priority first.
+
+    Waiters queue on a heap of (priority, arrival); a single dispatcher task
+    releases them as tokens become available, so a burst of /checklink calls
+    never delays a live message scan.
+    """
+
+    def __init__(self, per_minute=RATE_PER_MINUTE, per_day=RATE_PER_DAY):
+        self.buckets = [TokenBucket(per_minute, 60), TokenBucket(per_day, 86400)]
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+        self._wakeup = None
+        self._task = None
+
+    async def acquire(self, priority=PRIORITY_LIVE, max_wait=None):
+        """Wait for a request slot. With max_wait, raises VirusTotalError instead of waiting longer."""
+        if max_wait is not None and self.delay() > max_wait:
+            raise VirusTotalError(f"quota exhausted, next request slot in {self.delay():.0f}s")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch())
+        elif self._wakeup is not None:
+            self._wakeup.set()
+        try:
+            await asyncio.wait_for(future, timeout=max_wait)
+        except asyncio.TimeoutError:
+            # wait_for cancelled the future, so the dispatcher skips it
+            raise VirusTotalError(f"no request slot within {max_wait:g}s") from None
+
+    def delay(self, now=None):
+        """Seconds until the next slot frees up, ignoring anyone already queued."""
+        now = now or time.monotonic()
+        return max([self._blocked_until - now] + [bucket.delay(now) for bucket in self.buckets])
+
+    def pause(self, seconds):
+        """Hold every request back, e.g. after the API answered 429."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    @property
+    def queued(self):
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+    async def _dispatch(self):
+        self._wakeup = asyncio.Event()
+        while self._waiters:
+            if self._waiters[0][2].done():  # caller gave up
+                heapq.heappop(self._waiters)
+                continue
+            delay = self.delay()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for bucket in self.buckets:
+                bucket.take()
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
+
+
+class VirusTotalClient:
+    """Quota-aware VirusTotal API client.
+
+    Results are served from the shared verdict cache when possible.
+    Concurrent lookups for the same URL share one in-flight request, every
+    request waits for a slot from the scheduler, and 429/5xx/network errors
+    are retried with exponential backoff. A lookup that still fails raises
+    VirusTotalError so callers never mistake it for "VT has nothing".
+    """
+
+    def __init__(self, http_client, api_key=None, per_minute=RATE_PER_MINUTE, per_day=RATE_PER_DAY,
+                 max_retries=MAX_RETRIES, cache=verdict_cache):
+        self.http = http_client
+        self.api_key = api_key if api_key is not None else os.getenv("VT_API_KEY")
+        self.scheduler = RequestScheduler(per_minute, per_day)
+        self.max_retries = max_retries
+        self.cache = cache
+        self._inflight = {}  # key -> [Task, waiting callers]
+
+    @property
+    def enabled(self):
+        return bool(self.api_key)
+
+    async def url_verdict(self, url, priority=PRIORITY_LIVE) -> UrlVerdict:
+        """Compact verdict for url (cached or fresh). Raises VirusTotalError on failure."""
+        cached = self.cache.get(url)
+        if cached is not None:
+            return cached
+        return await self._single_flight(("url", url), lambda: self._lookup_url(url, priority))
+
+    async def _lookup_url(self, url, priority):
+        data = await self._fetch(f"{VT_API_URL}/urls/{encode_url_to_vt_id(url)}", priority)
+        return self.cache.put(UrlVerdict.from_report(url, data))
+
+    async def file_stats(self, sha256, priority=PRIORITY_LIVE, max_wait=None):
+        """last_analysis_stats for a file hash, or None if VT has never seen it. Raises VirusTotalError on failure,
+        including when no request slot frees up within max_wait seconds."""
+        return await self._single_flight(("file", sha256), lambda: self._lookup_file(sha256, priority, max_wait))
+
+    async def _lookup_file(self, sha256, priority, max_wait):
+        data = await self._fetch(f"{VT_API_URL}/files/{sha256}", priority, max_wait)
+        if not data:
+            return None
+        return data.get("data", {}).get("attributes", {}).get("last_analysis_stats", {})
+
+    async def _single_flight(self, key, factory):
+        entry = self._inflight.get(key)
+        if entry is None or entry[0].cancelled():
+            task = asyncio.ensure_future(factory())
+            entry = self._inflight[key] = [task, 0]  # [lookup, callers waiting on it]
+            task.add_done_callback(lambda _, entry=entry: self._inflight.get(key) is entry and self._inflight.pop(key))
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # Shield so one cancelled caller doesn't cancel the lookup for everyone else
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not task.done():
+                task.cancel()  # nobody wants the result any more; frees its queued request slot
+
+    async def _fetch(self, endpoint, priority, max_wait=None):
+        headers = {"x-apikey": self.api_key}
+        error = None
+        for attempt in range(self.max_retries + 1):
+            await self.scheduler.acquire(priority, max_wait)
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.8, 1.2)
+            try:
+                async with self.http.get(endpoint, headers=headers) as resp:
+                    if resp.status == 200:
+                        return await resp.json()
+                    if resp.status == 404:
+                        return None
+                    error = f"HTTP {resp.status}"
+                    if resp.status == 429:
+                        retry_after = resp.headers.get("Retry-After", "")
+                        self.scheduler.pause(float(retry_after) if retry_after.isdigit() else backoff)
+                        continue
+                    if resp.status < 500:
+                        raise VirusTotalError(error)  # bad key, bad request: retrying won't help
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+            if attempt < self.max_retries:
+                await asyncio.sleep(backoff)
+        raise VirusTotalError(f"gave up after {self.max_retries + 1} attempts: {error}")
@@ -0,0 +1,188 @@
+import asyncio
+import random
+import time
+from typing import NamedTuple, Optional
+
+import discord
+
+from core.pipeline import RecentIds
+
+SEED_DELAY = 1.0                  # seconds between guild fetches while seeding / resyncing
+RESYNC_CHECK = 10 * 60            # how often guilds due for a resync are looked for
+RESYNC_BATCH = 10                 # guilds resynced per check at most
+RESYNC_MIN = 6 * 60 * 60          # resync interval right after drift was found
+RESYNC_MAX = 7 * 24 * 60 * 60     # interval for guilds whose inventory keeps matching
+CHANNEL_DEBOUNCE = 1.0            # webhook update bursts in one channel cost one fetch
+
+
+class WebhookRecord(NamedTuple):
+    id: int
+    name: str
+    channel_id: Optional[int]
+    creator_id: Optional[int]
+
+    @classmethod
+    def from_webhook(cls, webhook):
+        creator = getattr(webhook, "user", None)
+        return cls(webhook.id, getattr(webhook, "name", None) or "", getattr(webhook, "channel_id", None),
+                   creator.id if creator else None)
+
+
+class GuildWebhooks:
+    def __init__(self):
+        self.hooks = {}           # webhook_id -> WebhookRecord
+        self.interval = RESYNC_MIN
+        self.next_resync = 0.0
+
+
+class WebhookInventory:
+    """In-memory webhook list per guild, kept current from gateway events.
+
+    Each guild is fetched once (seeding is staggered so startup doesn't
+    burst REST calls), then updated from webhook audit-log entries and
+    on_webhooks_update, which re-fetches only the affected channel. A full
+    resync is a safety net for missed events: a guild's interval doubles
+    (up to RESYNC_MAX) every time a resync finds nothing new and drops back
+    to RESYNC_MIN when it finds drift.
+    """
+
+    def __init__(self, seed_delay=SEED_DELAY, resync_batch=RESYNC_BATCH, debounce=CHANNEL_DEBOUNCE):
+        self.seed_delay = seed_delay
+        self.resync_batch = resync_batch
+        self.debounce = debounce
+        self._guilds = {}          # guild_id -> GuildWebhooks (only guilds fetched at least once)
+        self._channel_tasks = {}   # channel_id -> debounced fetch Task
+        self.handled = RecentIds()  # webhook ids already reviewed, whichever event saw them first
+        self.seeding = None
+        self.fetches = 0
+
+    # --- Queries ---
+    def get(self, guild_id):
+        """{webhook_id: WebhookRecord} for the guild, or None if it hasn't been fetched yet."""
+        state = self._guilds.get(guild_id)
+        return state.hooks if state else None
+
+    def count(self, guild_id):
+        state = self._guilds.get(guild_id)
+        return len(state.hooks) if state else None
+
+    # --- Event updates ---
+    def add(self, guild_id, webhook):
+        """Record a webhook seen in an event. Returns True if it wasn't known."""
+        state = self._guilds.get(guild_id)
+        if state is None:
+            return True  # not seeded yet; the seed fetch will pick it up
+        record = WebhookRecord.from_webhook(webhook)
+        known = state.hooks.get(record.id)
+        if known is not None:
+            # Audit-log targets can be partial; keep what we already know
+            record = WebhookRecord(record.id, record.name or known.name,
+                                   record.channel_id or known.channel_id, record.creator_id or known.creator_id)
+        state.hooks[record.id] = record
+        return known is None
+
+    def remove(self, guild_id, webhook_id):
+        state = self._guilds.get(guild_id)
+        if state is not None:
+            state.hooks.pop(webhook_id, None)
+
+    def forget(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+    # --- Fetching ---
+    async def fetch_guild(self, guild: discord.Guild):
+        """Full fetch of a guild's webhooks. Returns the webhooks that weren't in the inventory
+        ([] on the first fetch, which only sets the baseline), or None if they can't be listed."""
+        state = self._guilds.get(guild.id)
+        try:
+            self.fetches += 1
+            webhooks = await guild.webhooks()
+        except (discord.Forbidden, discord.HTTPException) as e:
+            print(f"[Webhooks] Could not list webhooks in {guild.name}: {e}")
+            if state is not None:
+                state.interval = RESYNC_MAX
+                state.next_resync = time.monotonic() + state.interval
+            return None
+
+        fresh = state is None
+        if fresh:
+            state = self._guilds[guild.id] = GuildWebhooks()
+        added = [w for w in webhooks if w.id not in state.hooks]
+        drift = bool(added) or len(webhooks) != len(state.hooks)
+        state.hooks = {w.id: WebhookRecord.from_webhook(w) for w in webhooks}
+        if fresh or drift:
+            state.interval = RESYNC_MIN
+        else:
+            state.interval = min(state.interval * 2, RESYNC_MAX)
+        # Jitter so guilds seeded together don't all come due together
+        state.next_resync = time.monotonic() + state.interval * random.uniform(0.8, 1.2)
+        if drift and not fresh:
+            print(f"[Webhooks] Resync of {guild.name} found drift ({len(added)} new, {len(webhooks)} total)")
+        return [] if fresh else added
+
+    async def fetch_channel(self, channel):
+        """Re-fetch one channel's webhooks after on_webhooks_update. Returns newly seen webhooks."""
+        if channel.guild.id not in self._guilds:
+            return []  # baseline not taken yet
+        task = self._channel_tasks.get(channel.id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_channel(channel))
+            self._channel_tasks[channel.id] = task
+            task.add_done_callback(lambda _: self._channel_tasks.pop(channel.id, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_channel(self, channel):
+        await asyncio.sleep(self.debounce)
+        try:
+            self.fetches += 1
+            webhooks = await channel.webhooks()
+        except (discord.Forbidden, discord.HTTPException) as e:
+            print(f"[Webhooks] Could not list webhooks in #{channel.name}: {e}")
+            return []
+        state = self._guilds.get(channel.guild.id)
+        if state is None:
+            return []
+        added = [w for w in webhooks if w.id not in state.hooks]
+        current = {w.id for w in webhooks}
+        for webhook_id, record in list(state.hooks.items()):
+            if record.channel_id == channel.id and webhook_id not in current:
+                del state.hooks[webhook_id]
+        for webhook in webhooks:
+            state.hooks[webhook.id] = WebhookRecord.from_webhook(webhook)
+        return added
+
+    async def seed(self, guilds):
+        """Fetch every guild not yet in the inventory, one every seed_delay seconds."""
+        count = 0
+        for guild in list(guilds):
+            if guild.id in self._guilds:
+                continue
+            if await self.fetch_guild(guild) is not None:
+                count += 1
+            await asyncio.sleep(self.seed_delay)
+        print(f"[Webhooks] Seeded webhook inventory for {count} guilds")
+
+    def start_seed(self, guilds):
+        if self.seeding is None or self.seeding.done():
+            self.seeding = asyncio.ensure_future(self.seed(guilds))
+
+    def due(self, now=None):
+        now = now or time.monotonic()
+        ready = [(state.next_resync, gid) for gid, state in self._guilds.items() if state.next_resync <= now]
+        return [gid for _, gid in sorted(ready)[:self.resync_batch]]
+
+    async def resync_due(self, get_guild):
+        """Resync the guilds that are due (at most resync_batch). Yields (guild, newly seen webhooks)."""
+        for guild_id in self.due():
+            guild = get_guild(guild_id)
+            if guild is None:
+                self.forget(guild_id)
+                continue
+            added = await self.fetch_guild(guild)
+            if added:
+                yield guild, added
+            await asyncio.sleep(self.seed_delay)
+
+
+# Shared instance used by SecurityCog
+webhook_inventory = WebhookInventory()
@@ -0,0 +1,146 @@
+import asyncio
+import atexit
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+MAX_TASKS_PER_CHILD = 50            # jobs per worker before the pool is replaced
+JOB_TIMEOUT = 20                    # seconds of execution before a job is abandoned and its pool replaced
+JOB_RETRIES = 1                     # resubmissions of a job whose pool broke under it
+MEMORY_LIMIT = 512 * 1024 * 1024    # address-space cap per worker (bytes)
+
+
+class JobTimeout(Exception):
+    """A worker job ran past its timeout."""
+
+
+class WorkerFailed(Exception):
+    """A worker died (crash, memory limit) while running a job."""
+
+
+def _init_worker(memory_limit):
+    if resource is not None and memory_limit:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ValueError, OSError) as e:
+            print(f"[Workers] Could not apply memory limit: {e}")
+
+
+class WorkerPool:
+    """Process pool for CPU-heavy analysis, awaited from the event loop.
+
+    Workers are spawned fresh and capped in memory where the platform
+    allows. After max_tasks_per_child jobs per worker the executor is
+    retired (its workers exit once their current jobs finish) and a new one
+    takes over; this is done here rather than with ProcessPoolExecutor's own
+    max_tasks_per_child, which can deadlock on Python 3.11.
+
+    Jobs wait here, not in the executor's queue, until a worker is free, so
+    the timeout only counts time spent running. A job that overruns it gets
+    its pool killed (there is no way to stop a single worker mid-job). Jobs
+    that were running in a pool that broke, whether killed for another job's
+    timeout or by a crashing worker, are resubmitted to a new pool once, so
+    only the job at fault keeps failing.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_tasks_per_child=MAX_TASKS_PER_CHILD,
+                 timeout=JOB_TIMEOUT, memory_limit=MEMORY_LIMIT, retries=JOB_RETRIES):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.retries = retries
+        self._executor = None
+        self._jobs = 0  # jobs submitted to the current executor
+        self._slots = None  # Semaphore(max_workers), created on the bot's loop
+        atexit.register(self.shutdown)
+
+    def _pool(self):
+        if self._executor is not None and self._jobs >= self.max_tasks_per_child * self.max_workers:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.memory_limit,),
+            )
+            self._jobs = 0
+        self._jobs += 1
+        return self._executor
+
+    async def run(self, fn, *args, timeout=None):
+        """Run fn(*args) in a worker process. fn must be a picklable module-level function.
+
+        Raises JobTimeout if it runs longer than the timeout and WorkerFailed if
+        its worker dies twice in a row.
+        """
+        for attempt in range(self.retries + 1):
+            executor, future = await self._submit(functools.partial(fn, *args))
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+            except asyncio.TimeoutError:
+                print(f"[Workers] {fn.__name__} timed out; recycling the pool")
+                self._recycle(executor)
+                raise JobTimeout(fn.__name__)
+            except BrokenProcessPool as e:
+                self._recycle(executor)
+                if attempt < self.retries:
+                    continue  # possibly taken down by another job; try once more in a fresh pool
+                raise WorkerFailed(f"{fn.__name__}: {e}")
+
+    async def _submit(self, job):
+        """Submit job once a worker is free, so the caller's timeout starts when it does."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        slots = self._slots
+        await slots.acquire()
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                pass  # loop already closed at shutdown
+
+        try:
+            executor = self._pool()
+            try:
+                future = executor.submit(job)
+            except BrokenProcessPool:  # a worker died since the last submit
+                self._recycle(executor)
+                executor = self._pool()
+                future = executor.submit(job)
+        except BaseException:
+            slots.release()
+            raise
+        # Freed when the job really ends: a cancelled caller doesn't stop a running job
+        future.add_done_callback(release)
+        return executor, future
+
+    def _recycle(self, executor):
+        if self._executor is executor:
+            self._executor = None
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared instance used by the attachment scanner and the CAPTCHA pool
+worker_pool = WorkerPool()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Run from anywhere: make the repo root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import Database
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh database in a temp dir (the chdir keeps the legacy JSON import away from the repo's files)."""
+    monkeypatch.chdir(tmp_path)
+    database = Database(str(tmp_path / "onyx.db"))
+    yield database
+    database.close()
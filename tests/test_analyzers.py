@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+from core.analyzers import analyze
+
+DOCX_PARTS = {
+    "[Content_Types].xml": "<Types/>",
+    "_rels/.rels": "<Relationships/>",
+    "docProps/core.xml": "<coreProperties/>",
+    "word/document.xml": "<document/>",
+    "word/media/image1.png": "png",
+}
+
+
+def make_zip(entries):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    return buf.getvalue()
+
+
+def test_plain_document_is_clean():
+    assert analyze("report.docx", make_zip(DOCX_PARTS)) is None
+
+
+def test_renamed_archive_with_executable_is_flagged():
+    assert analyze("evil.docx", make_zip({"x.exe": b"MZ"})) == "document contains `x.exe`"
+
+
+def test_labeled_signed_and_customized_documents_are_clean():
+    parts = {
+        **DOCX_PARTS,
+        "docMetadata/LabelInfo.xml": "<labelList/>",
+        "_xmlsignatures/sig1.xml": "<Signature/>",
+        "_xmlsignatures/_rels/origin.sigs.rels": "<Relationships/>",
+        "customUI/customUI14.xml": "<customUI/>",
+        "word/fonts/font1.odttf": b"\x01\x02",
+        "word/embeddings/Microsoft_Excel_Worksheet.xlsx": make_zip({"xl/workbook.xml": "<workbook/>"}),
+    }
+    assert analyze("report.docx", make_zip(parts)) is None
+
+
+def test_executable_renamed_inside_document_is_flagged():
+    reason = analyze("invoice.xlsx", make_zip({**DOCX_PARTS, "xl/media/image2.png": b"MZ" + b"\0" * 64}))
+    assert reason == "document contains Windows executable `xl/media/image2.png`"
+
+
+def test_risky_document_parts_are_flagged():
+    ole = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\0" * 64
+    cases = {
+        "word/vbaProject.bin": "document contains VBA macros (`word/vbaProject.bin`)",
+        "word/embeddings/oleObject1.bin": "document embeds OLE object `word/embeddings/oleObject1.bin`",
+        "word/activeX/activeX1.bin": "document embeds OLE object `word/activeX/activeX1.bin`",
+        "word/media/stuff.zip": "document contains archive `word/media/stuff.zip`",
+    }
+    for name, reason in cases.items():
+        assert analyze("report.docx", make_zip({**DOCX_PARTS, name: ole})) == reason
+
+
+def test_suspicious_name_inside_document_parts_is_flagged():
+    reason = analyze("report.docx", make_zip({**DOCX_PARTS, "word/embeddings/run.js": "x"}))
+    assert reason == "document contains `word/embeddings/run.js`"
+
+
+def test_archive_entries():
+    assert analyze("files.zip", make_zip({"readme.txt": "hi", "setup.exe": b"MZ"})) == "archive contains `setup.exe`"
+    assert analyze("files.zip", make_zip({"readme.txt": "hi", "notes.docx": make_zip(DOCX_PARTS)})) is None
+
+
+def test_document_nested_in_archive_is_listed():
+    data = make_zip({"notes.docx": make_zip({"x.scr": b"MZ"})})
+    assert analyze("files.zip", data) == "document contains `x.scr` (inside `notes.docx`)"
+
+
+def test_renamed_executable_is_flagged():
+    assert analyze("cat.png", b"MZ" + b"\0" * 64) == "Windows executable disguised as `.png`"
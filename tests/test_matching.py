@@ -0,0 +1,90 @@
+from core.matching import (
+    KeywordMatcher, GuildKeywordMatchers, DomainTrie, GuildDomainIndex, normalize_domain, ALLOW, DENY,
+)
+
+
+# --- Keyword matcher (Aho-Corasick) ---
+def test_finds_overlapping_and_nested_keywords():
+    matcher = KeywordMatcher(["he", "she", "his", "hers"])
+    assert sorted(matcher.search("ushers")) == [(1, "she"), (2, "he"), (2, "hers")]
+
+
+def test_matching_is_case_insensitive_and_reports_original_spelling():
+    matcher = KeywordMatcher(["Free Nitro"])
+    assert matcher.matched("get FREE NITRO now") == ["Free Nitro"]
+
+
+def test_failure_links_recover_after_partial_match():
+    matcher = KeywordMatcher(["abcd", "bce"])
+    # "abc" is a dead end for abcd; the automaton must fall back to "bc" and finish "bce"
+    assert matcher.search("xabce") == [(2, "bce")]
+
+
+def test_matched_is_distinct_in_order_of_first_appearance():
+    matcher = KeywordMatcher(["b", "a"])
+    assert matcher.matched("a b a b") == ["a", "b"]
+
+
+def test_empty_and_duplicate_keywords_are_ignored():
+    matcher = KeywordMatcher(["", "x", "x"])
+    assert matcher.keywords == ("x",)
+    assert KeywordMatcher([]).search("anything") == []
+
+
+def test_guild_matcher_is_rebuilt_only_when_its_keywords_change():
+    matchers = GuildKeywordMatchers(["global"])
+    first = matchers.get(1, ["local"])
+    assert matchers.get(1, ("local",)) is first
+    assert matchers.get(1, ["local", "more"]).matched("more global") == ["more", "global"]
+    assert matchers.get(2, ()) is matchers._global
+
+
+# --- Domain trie ---
+def test_rule_covers_subdomains_but_only_on_label_boundaries():
+    trie = DomainTrie([("example.com", DENY)])
+    assert trie.match("example.com") == (2, DENY, "example.com")
+    assert trie.match("a.b.example.com") == (2, DENY, "example.com")
+    assert trie.match("notexample.com") is None
+    assert trie.match("example.com.evil.net") is None
+    assert trie.match("com") is None
+
+
+def test_most_specific_rule_wins_and_allow_beats_deny_on_the_same_domain():
+    trie = DomainTrie([("example.com", DENY), ("safe.example.com", ALLOW), ("both.org", DENY), ("both.org", ALLOW)])
+    assert trie.match("x.safe.example.com")[1] == ALLOW
+    assert trie.match("other.example.com")[1] == DENY
+    assert trie.match("both.org")[1] == ALLOW
+
+
+def test_rules_and_hostnames_are_normalized():
+    trie = DomainTrie([("*.Example.COM.", DENY)])
+    assert trie.match("WWW.example.com")[2] == "example.com"
+
+
+def test_empty_labels_and_trailing_dots_still_match():
+    trie = DomainTrie([("grabify.link", DENY), ("a..b.example", DENY), ("..", DENY)])
+    assert trie.match("x..grabify.link") == (2, DENY, "grabify.link")
+    assert trie.match("grabify.link.") == (2, DENY, "grabify.link")
+    assert trie.match("..grabify..link..") == (2, DENY, "grabify.link")
+    assert trie.match("a.b.example") == (3, DENY, "a.b.example")
+    assert trie.match("..") is None
+    assert normalize_domain("x..Grabify.link.") == "x.grabify.link"
+
+
+def test_remove_prunes_only_the_removed_rule():
+    trie = DomainTrie([("a.example.com", DENY), ("example.com", DENY)])
+    trie.remove("a.example.com")
+    assert trie.match("a.example.com") == (2, DENY, "example.com")
+    trie.remove("example.com")
+    assert trie.match("a.example.com") is None
+    assert trie._root == {}
+
+
+def test_guild_rules_are_applied_incrementally_and_global_allow_holds():
+    index = GuildDomainIndex(["grabify.link"], ["discord.com"])
+    assert index.resolve(1, ("bad.net",), "x.bad.net") == (DENY, "bad.net")
+    assert index.resolve(1, ("other.net",), "x.bad.net") == (None, None)
+    assert index.resolve(1, ("other.net",), "grabify.link") == (DENY, "grabify.link")
+    assert index.resolve(1, ("discord.com",), "discord.com") == (ALLOW, "discord.com")
+    # A more specific guild rule beats a broader global allow
+    assert index.resolve(1, ("cdn.discord.com",), "x.cdn.discord.com") == (DENY, "cdn.discord.com")
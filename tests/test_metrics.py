@@ -0,0 +1,64 @@
+import atexit
+import sqlite3
+import threading
+
+import pytest
+
+from core.metrics import MetricsRecorder, query_totals
+
+
+@pytest.fixture
+def recorders(database, tmp_path):
+    """Make MetricsRecorders sharing one database and journal; their exit-time flushes are dropped."""
+    made = []
+
+    def make():
+        recorder = MetricsRecorder(database, journal_path=str(tmp_path / "metrics.journal"), flush_threshold=1000)
+        made.append(recorder)
+        return recorder
+
+    yield make
+    for recorder in made:
+        atexit.unregister(recorder.flush)
+
+
+def test_flush_writes_totals(database, recorders):
+    recorder = recorders()
+    recorder.incr(1, "links_removed")
+    recorder.incr(1, "links_removed", 2)
+    recorder.flush().result()
+    assert query_totals(1, database)["links_removed"] == 3
+    assert recorder.flush() is None
+
+
+def test_failed_flush_is_not_overtaken_and_survives_a_crash(database, recorders):
+    real_write = database.write
+    release = threading.Event()
+
+    def failing_write(fn):
+        database.write = real_write
+
+        def fail(conn):
+            release.wait(5)
+            raise sqlite3.OperationalError("disk I/O error")
+
+        return real_write(fail)
+
+    database.write = failing_write
+    recorder = recorders()
+    for _ in range(3):
+        recorder.incr(1, "links_removed")
+    first = recorder.flush()
+    recorder.incr(1, "links_removed", 2)
+    assert recorder.flush() is first  # no second flush while the first is in flight
+    release.set()
+    with pytest.raises(sqlite3.OperationalError):
+        first.result()
+    assert recorder._pending_count == 4  # 3 restored increments + 1 new one, not the number of keys
+    assert query_totals(1, database)["links_removed"] == 0
+
+    # Crash before the next flush: a new recorder replays every journaled increment
+    restarted = recorders()
+    assert restarted.totals(1)["links_removed"] == 5
+    restarted.flush().result()
+    assert query_totals(1, database)["links_removed"] == 5
@@ -0,0 +1,67 @@
+import pytest
+
+from core import offenses
+from core.offenses import OffenseLedger
+
+HOUR = 3600
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(offenses.time, "time", lambda: now[0])
+    return now
+
+
+def test_counts_only_offenses_inside_the_window(database, clock):
+    ledger = OffenseLedger(database)
+    assert ledger.record(1, 2, "spam", window_hours=24) == 1
+    clock[0] += 10 * HOUR
+    assert ledger.record(1, 2, "spam", window_hours=24) == 2
+    clock[0] += 20 * HOUR
+    # The first offense is now 30 hours old
+    assert ledger.record(1, 2, "spam", window_hours=24) == 2
+    assert ledger.count_recent(1, 2, hours=24) == 2
+    assert ledger.count_recent(1, 2, hours=48) == 3
+
+
+def test_guilds_and_users_are_separate(database, clock):
+    ledger = OffenseLedger(database)
+    ledger.record(1, 2, "a")
+    ledger.record(1, 3, "b")
+    ledger.record(4, 2, "c")
+    assert ledger.count_recent(1, 2) == 1
+    assert ledger.history(4, 2) == [(clock[0], "c")]
+    assert ledger.count_recent(9, 9) == 0
+
+
+def test_history_survives_a_restart(database, clock):
+    OffenseLedger(database).record(1, 2, "spam")
+    database.close()  # flush queued writes
+    assert OffenseLedger(database).history(1, 2) == [(clock[0], "spam")]
+
+
+def test_sweep_drops_expired_offenses(database, clock):
+    ledger = OffenseLedger(database, retention_hours=1)
+    ledger.record(1, 2, "old")
+    clock[0] += 0.5 * HOUR
+    ledger.record(1, 2, "new")
+    clock[0] += 0.75 * HOUR
+    assert ledger.sweep() == 1
+    assert [reason for _, reason in ledger.history(1, 2)] == ["new"]
+    clock[0] += HOUR
+    ledger.sweep()
+    assert ledger.history(1, 2) == []
+    assert not ledger._expiry
+
+
+def test_sweep_ignores_expiry_entries_of_cleared_users(database, clock):
+    ledger = OffenseLedger(database, retention_hours=1)
+    ledger.record(1, 2, "before clear")
+    ledger.clear(1, 2)
+    clock[0] += 0.5 * HOUR
+    ledger.record(1, 2, "after clear")
+    clock[0] += 0.75 * HOUR  # past the cleared offense's deadline only
+    assert ledger.sweep() == 0
+    assert [reason for _, reason in ledger.history(1, 2)] == ["after clear"]
+    assert len(ledger._expiry) == 1
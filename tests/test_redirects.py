@@ -0,0 +1,140 @@
+import asyncio
+
+from aiohttp import ClientTimeout, web
+from aiohttp.test_utils import TestServer
+
+from core.http_client import HttpClient
+from core.redirects import RedirectResolver
+
+
+def make_app(hits):
+    """A stand-in shortener on 127.0.0.1. Destinations point at localhost, which is not a shortener."""
+
+    async def chain(request):
+        hits[request.path] = hits.get(request.path, 0) + 1
+        n = int(request.match_info["n"])
+        port = request.url.port
+        target = f"/chain/{n - 1}" if n > 1 else f"http://localhost:{port}/final"
+        raise web.HTTPFound(target)
+
+    async def loop(request):
+        hits[request.path] = hits.get(request.path, 0) + 1
+        raise web.HTTPMovedPermanently(f"/loop/{int(request.match_info['n']) + 1}")
+
+    async def cycle(request):
+        raise web.HTTPFound("/cycle")
+
+    async def slow(request):
+        hits[request.path] = hits.get(request.path, 0) + 1
+        await asyncio.sleep(0.2)
+        raise web.HTTPFound(f"http://localhost:{request.url.port}/final")
+
+    async def no_head(request):
+        hits[f"{request.method} {request.path}"] = hits.get(f"{request.method} {request.path}", 0) + 1
+        if request.method == "HEAD":
+            raise web.HTTPMethodNotAllowed("HEAD", ["GET"])
+        raise web.HTTPFound(f"http://localhost:{request.url.port}/final")
+
+    async def plain(request):
+        return web.Response(text="not a redirect")
+
+    app = web.Application()
+    app.router.add_route("*", "/chain/{n}", chain)
+    app.router.add_route("*", "/loop/{n}", loop)
+    app.router.add_route("*", "/cycle", cycle)
+    app.router.add_route("*", "/slow", slow)
+    app.router.add_route("*", "/no-head", no_head)
+    app.router.add_route("*", "/plain", plain)
+    return app
+
+
+def run(scenario, **options):
+    """Run scenario(resolver, base_url, hits) against a local shortener server."""
+
+    async def main():
+        hits = {}
+        server = TestServer(make_app(hits), host="127.0.0.1")
+        await server.start_server()
+        http = HttpClient()
+        try:
+            resolver = RedirectResolver(http, shorteners={"127.0.0.1"}, **options)
+            return await scenario(resolver, f"http://127.0.0.1:{server.port}", hits)
+        finally:
+            await http.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_follows_chain_and_stops_before_the_destination():
+    async def scenario(resolver, base, hits):
+        chain = await resolver.expand(f"{base}/chain/3")
+        port = base.rsplit(":", 1)[1]
+        assert chain == (f"{base}/chain/3", f"{base}/chain/2", f"{base}/chain/1", f"http://localhost:{port}/final")
+        assert "/final" not in hits  # the destination itself is never requested
+
+    run(scenario)
+
+
+def test_hop_limit():
+    async def scenario(resolver, base, hits):
+        chain = await resolver.expand(f"{base}/loop/0")
+        assert len(chain) == 4  # the link plus max_hops hops
+        assert sum(hits.values()) == 3
+
+    run(scenario, max_hops=3)
+
+
+def test_redirect_cycle_ends_the_chain():
+    async def scenario(resolver, base, hits):
+        assert await resolver.expand(f"{base}/cycle") == (f"{base}/cycle",)
+
+    run(scenario)
+
+
+def test_non_redirect_and_non_shortener_links():
+    async def scenario(resolver, base, hits):
+        assert await resolver.expand(f"{base}/plain") == (f"{base}/plain",)
+        assert await resolver.expand("https://example.com/x") == ("https://example.com/x",)
+
+    run(scenario)
+
+
+def test_concurrent_expansions_share_one_resolution():
+    async def scenario(resolver, base, hits):
+        chains = await asyncio.gather(*(resolver.expand(f"{base}/slow") for _ in range(10)))
+        assert len(set(chains)) == 1
+        assert hits["/slow"] == 1
+
+    run(scenario)
+
+
+def test_cached_chain_is_reused_until_it_expires():
+    async def scenario(resolver, base, hits):
+        first = await resolver.expand(f"{base}/chain/1")
+        assert await resolver.expand(f"{base}/chain/1") == first
+        assert hits["/chain/1"] == 1
+        await asyncio.sleep(0.15)
+        await resolver.expand(f"{base}/chain/1")
+        assert hits["/chain/1"] == 2
+
+    run(scenario, ttl=0.1)
+
+
+def test_falls_back_to_get_when_head_is_refused():
+    async def scenario(resolver, base, hits):
+        chain = await resolver.expand(f"{base}/no-head")
+        assert chain[-1].startswith("http://localhost:")
+        assert hits == {"HEAD /no-head": 1, "GET /no-head": 1}
+
+    run(scenario)
+
+
+def test_failed_expansion_is_not_cached():
+    async def scenario(resolver, base, hits):
+        await resolver.expand(f"{base}/slow")
+        assert f"{base}/slow" not in resolver._cache  # timed out
+        resolver.timeout = ClientTimeout(total=5)
+        assert len(await resolver.expand(f"{base}/slow")) == 2
+
+    run(scenario, timeout=0.05)
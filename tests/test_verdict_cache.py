@@ -0,0 +1,31 @@
+import pytest
+
+from core import verdict_cache
+from core.verdict_cache import FileVerdict, FileVerdictCache, FILE_NEGATIVE_TTL, FILE_POSITIVE_TTL
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(verdict_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_clean_file_verdicts_expire_long_before_flagged_ones(database, clock):
+    cache = FileVerdictCache(database)
+    cache.put(FileVerdict("clean", False, checked_at=clock[0]))
+    cache.put(FileVerdict("bad", True, "known malware (3 engines flagged)", 3, checked_at=clock[0]))
+    clock[0] += FILE_NEGATIVE_TTL - 1
+    assert cache.get("clean") is not None
+    clock[0] += 1
+    assert cache.get("clean") is None  # unknown to VirusTotal then; asked again now
+    clock[0] += FILE_POSITIVE_TTL - FILE_NEGATIVE_TTL - 1
+    assert cache.get("bad").flagged
+    clock[0] += 1
+    assert cache.get("bad") is None
+
+
+def test_verdicts_are_read_back_from_the_database(database, clock):
+    FileVerdictCache(database).put(FileVerdict("bad", True, "reason", 2, checked_at=clock[0]))
+    database.close()  # flush the write-through
+    assert FileVerdictCache(database).get("bad") == FileVerdict("bad", True, "reason", 2, clock[0])